@@ -0,0 +1,84 @@
+# Compares the plain read() path with the large-file path of checksum hashing (mmap), split and the raw zip
+# entry copy (copy_file_range where the platform has it).
+# Run with the labs package importable as `cur`, the same way the peer is started:
+#     python benchmarks/bench_large_io.py --size-mb 512 --repeat 3
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import zipfile
+
+from cur import config
+from cur.core.checksum import ChecksumManager
+from cur.core.streams import split_file
+from cur.core.zipcopy import copy_zip_entry_raw
+
+READ_ONLY = 0
+LARGE_FILE = 1
+
+
+def _make_input(directory, size):
+    path = os.path.join(directory, 'input.bin')
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        for _ in range(size // len(block)):
+            f.write(block)
+    archive_path = os.path.join(directory, 'input.zip')
+    with zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_STORED) as zipf:
+        zipf.write(path, 'input.bin')
+    return path, archive_path
+
+
+def bench_hash(path, directory):
+    ChecksumManager.hash_file(path)
+
+
+def bench_split(path, directory):
+    split_file(path, 64 * 1024 * 1024)
+
+
+def bench_zip_copy(archive_path, directory):
+    with zipfile.ZipFile(archive_path, 'r') as src_zip, open(archive_path, 'rb') as src, \
+            zipfile.ZipFile(os.path.join(directory, 'copy.zip'), 'w') as dst_zip:
+        for info in src_zip.infolist():
+            copy_zip_entry_raw(src, info, dst_zip)
+
+
+def _timed(function, argument, directory, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(argument, directory)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="read() versus the large-file paths")
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    directory = tempfile.mkdtemp(prefix='trpz-bench-')
+    try:
+        path, archive_path = _make_input(directory, size)
+        cases = [('checksum', bench_hash, path), ('split', bench_split, path), ('zip copy', bench_zip_copy, archive_path)]
+        print(f"{'case':<10} {'read() MB/s':>12} {'large MB/s':>12} {'speedup':>8}")
+        for name, function, argument in cases:
+            results = {}
+            for mode, threshold in ((READ_ONLY, 0), (LARGE_FILE, 1)):
+                config.large_io_threshold = threshold
+                function(argument, directory)  # warm the page cache so both paths read from memory
+                results[mode] = _timed(function, argument, directory, args.repeat)
+            read_rate = args.size_mb / results[READ_ONLY]
+            large_rate = args.size_mb / results[LARGE_FILE]
+            print(f"{name:<10} {read_rate:>12.0f} {large_rate:>12.0f} {large_rate / read_rate:>7.2f}x")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,33 @@
+import os
+
 server_ports = [43243,43242,53454,21332, 10042,10045,10047,42364,3432,9654,43205,6067,45895,3453,50764,43254]
+
+# paths to the RAR tools; override with TRPZ_RAR / TRPZ_UNRAR, e.g. r"C:\Program Files\WinRAR\rar.exe"
+rar_executable = os.environ.get("TRPZ_RAR", "rar")
+unrar_executable = os.environ.get("TRPZ_UNRAR", "unrar")
+rar_max_processes = int(os.environ.get("TRPZ_RAR_PROCESSES", "4"))
+
+# SQLite catalog of archive contents, off unless TRPZ_CATALOG names a database file, e.g. ~/.trpz_catalog.sqlite3
+catalog_path = os.path.expanduser(os.environ.get("TRPZ_CATALOG", ""))
+catalog_scan_workers = int(os.environ.get("TRPZ_CATALOG_WORKERS", str(os.cpu_count() or 1)))
+
+# hosts probed for cluster peers on server_ports; comma separated in TRPZ_CLUSTER_HOSTS
+cluster_hosts = os.environ.get("TRPZ_CLUSTER_HOSTS", "localhost").split(",")
+cluster_bind_host = os.environ.get("TRPZ_CLUSTER_BIND", "localhost")
+# shared by all peers of a cluster and used to sign every request; a peer without it only binds to loopback
+cluster_secret = os.environ.get("TRPZ_CLUSTER_SECRET", "")
+
+# resource governor: memory for I/O buffers across all sessions, disk and network bandwidth in bytes per second; 0 means unlimited
+memory_budget = int(os.environ.get("TRPZ_MEMORY_BUDGET", str(256 * 1024 * 1024)))
+disk_bandwidth = int(os.environ.get("TRPZ_DISK_BANDWIDTH", "0"))
+network_bandwidth = int(os.environ.get("TRPZ_NETWORK_BANDWIDTH", "0"))
+
+# worker threads shared by all AsyncArchiveFacade instances in a process
+async_max_workers = int(os.environ.get("TRPZ_ASYNC_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+
+# long tar.gz creates and zip extracts save a resumable checkpoint after this many bytes; 0 disables checkpoints
+checkpoint_interval = int(os.environ.get("TRPZ_CHECKPOINT_BYTES", str(64 * 1024 * 1024)))
+
+# file regions of at least this many bytes are hashed through mmap and copied with copy_file_range;
+# 0 always uses read()
+large_io_threshold = int(os.environ.get("TRPZ_LARGE_IO_THRESHOLD", str(8 * 1024 * 1024)))
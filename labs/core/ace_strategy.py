@@ -0,0 +1,51 @@
+from cur.core.strategy import ArchiveStrategy
+
+
+class AceStrategy(ArchiveStrategy):
+    def create(self, archive_manager, file_names_or_dir):
+        try:
+            return "Creation of .ace archives is not supported."
+        except Exception as e:
+            return f"Error creating .ace archive: {e}"
+
+    def extract(self, archive_manager, extract_path):
+        try:
+            return "Extraction of .ace archives is not supported."
+        except Exception as e:
+            return f"Error extracting .ace archive: {e}"
+
+    def add(self, archive_manager, file_names_or_dir):
+        try:
+            return "Adding files to .ace archives is not supported."
+        except Exception as e:
+            return f"Error adding files to .ace archive: {e}"
+
+    def remove(self, archive_manager, items_to_remove):
+        try:
+            return "Removing files from .ace archives is not supported."
+        except Exception as e:
+            return f"Error removing items from .ace archive: {e}"
+
+    def edit_metadata(self, archive_manager, new_metadata):
+        try:
+            return "Editing metadata is not supported for ACE archives."
+        except Exception as e:
+            return f"Error editing metadata for ACE archive: {e}"
+
+    def show_metadata(self, archive_manager):
+        try:
+            return "Showing metadata is not supported for ACE archives."
+        except Exception as e:
+            return f"Error showing metadata for ACE archive: {e}"
+
+    def test(self, archive_manager, mode=None):
+        try:
+            return "Testing .ace archives is not supported."
+        except Exception as e:
+            return f"Error testing ACE archive: {e}"
+
+    def verify(self, archive_manager, fail_fast=False):
+        try:
+            return "Verifying .ace archives is not supported."
+        except Exception as e:
+            return f"Error verifying ACE archive: {e}"
\ No newline at end of file
@@ -0,0 +1,145 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cur import config
+from cur.core.manager import ArchiveManager
+from cur.core.strategy import StreamMember
+from cur.core.streams import check_cancelled, set_cancel_event
+
+_executor = None
+_executor_lock = threading.Lock()
+_EXHAUSTED = object()
+
+
+def default_executor():
+    # one bounded pool per process, however many facades and event loops use it
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.async_max_workers, thread_name_prefix='trpz-async')
+        return _executor
+
+
+def _call(cancel_event, function, args):
+    set_cancel_event(cancel_event)
+    check_cancelled()
+    return function(*args)
+
+
+def _bridge(loop, aiterable):
+    # runs on a worker thread and pulls from an async iterable owned by the event loop
+    iterator = aiterable.__aiter__()
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(iterator.__anext__(), loop).result()
+        except StopAsyncIteration:
+            return
+
+
+def _sync_members(loop, members):
+    members = _bridge(loop, members) if hasattr(members, '__aiter__') else members
+    for member in members:
+        member = StreamMember(*member)
+        if hasattr(member.source, '__aiter__'):
+            member = member._replace(source=_bridge(loop, member.source))
+        yield member
+
+
+class AsyncArchiveFacade:
+    def __init__(self, archive_type, archive_path, executor=None):
+        self.archive_manager = ArchiveManager(archive_type, archive_path)
+        self.executor = executor or default_executor()
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        cancel_event = threading.Event()
+        context = contextvars.copy_context()
+        future = loop.run_in_executor(self.executor, context.run, _call, cancel_event, function, args)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # the worker stops at its next chunk; wait for it so no half-written file is still being touched
+            cancel_event.set()
+            try:
+                await future
+            except Exception:
+                pass
+            raise
+
+    async def _iterate(self, function, *args):
+        loop = asyncio.get_running_loop()
+        cancel_event = threading.Event()
+        context = contextvars.copy_context()
+        context.run(set_cancel_event, cancel_event)
+        iterator = await loop.run_in_executor(self.executor, context.run, lambda: iter(function(*args)))
+        pending = None
+        try:
+            while True:
+                pending = loop.run_in_executor(self.executor, context.run, next, iterator, _EXHAUSTED)
+                item = await asyncio.shield(pending)
+                pending = None
+                if item is _EXHAUSTED:
+                    return
+                yield item
+        finally:
+            cancel_event.set()
+            if pending is not None:
+                # a generator cannot be closed while another thread is still inside it
+                try:
+                    await pending
+                except Exception:
+                    pass
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                await asyncio.shield(loop.run_in_executor(self.executor, context.run, close))
+
+    async def create_archive(self, file_names_or_dir):
+        return await self._run(self.archive_manager.create, file_names_or_dir)
+
+    async def create_archive_from_stream(self, members):
+        loop = asyncio.get_running_loop()
+        return await self._run(lambda: self.archive_manager.create_from_stream(_sync_members(loop, members)))
+
+    async def add_streams(self, members):
+        loop = asyncio.get_running_loop()
+        return await self._run(lambda: self.archive_manager.add_from_stream(_sync_members(loop, members)))
+
+    async def resume_archive(self):
+        return await self._run(self.archive_manager.resume)
+
+    async def extract_archive(self, extract_path):
+        return await self._run(self.archive_manager.extract, extract_path)
+
+    async def add_files(self, file_names_or_dir):
+        return await self._run(self.archive_manager.add, file_names_or_dir)
+
+    async def remove_items(self, items_to_remove):
+        return await self._run(self.archive_manager.remove, items_to_remove)
+
+    async def edit_metadata(self, new_metadata):
+        return await self._run(self.archive_manager.edit_metadata, new_metadata)
+
+    async def show_metadata(self):
+        return await self._run(self.archive_manager.show_metadata)
+
+    async def test_archive(self, mode=None):
+        return await self._run(self.archive_manager.test, mode)
+
+    async def verify_archive(self, fail_fast=False):
+        return await self._run(self.archive_manager.verify, fail_fast)
+
+    async def split_archive(self, part_size):
+        return await self._run(self.archive_manager.split, part_size)
+
+    async def convert_archive(self, target_type, target_path):
+        return await self._run(self.archive_manager.convert, target_type, target_path)
+
+    def iter_members(self):
+        # async generator of MemberInfo, read from the archive as the consumer asks for them
+        return self._iterate(self.archive_manager.iter_members)
+
+    def extract_stream(self, extract_path):
+        # async generator of member names, each yielded once it has been written to disk
+        return self._iterate(self.archive_manager.iter_extract, extract_path)
@@ -0,0 +1,210 @@
+import multiprocessing
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cur import config
+from cur.core import registry
+from cur.core.checksum import ChecksumManager
+
+FIND_NAME = 'name'
+FIND_GLOB = 'glob'
+FIND_DIGEST = 'digest'
+
+_ANSI_ESCAPE = re.compile(r'\033\[[0-9;]*m')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    archive_type TEXT,
+    size INTEGER,
+    mtime REAL,
+    metadata TEXT,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS members (
+    archive_id INTEGER NOT NULL REFERENCES archives(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    basename TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    digest TEXT
+);
+CREATE INDEX IF NOT EXISTS members_archive ON members(archive_id);
+CREATE INDEX IF NOT EXISTS members_name ON members(name);
+CREATE INDEX IF NOT EXISTS members_basename ON members(basename);
+CREATE INDEX IF NOT EXISTS members_digest ON members(digest);
+"""
+
+_FIND_QUERIES = {
+    FIND_NAME: "m.name = :query OR m.basename = :query",
+    FIND_GLOB: "m.name GLOB :query OR m.basename GLOB :query",
+    FIND_DIGEST: "m.digest = :query",
+}
+
+
+def _describe_archive(archive_path, archive_type):
+    from cur.core.manager import ArchiveManager
+    archive_manager = ArchiveManager(archive_type, archive_path)
+    strategy = archive_manager.strategy
+    st = os.stat(archive_path)
+    members = list(strategy.iter_members(archive_manager))
+    metadata = _ANSI_ESCAPE.sub('', strategy.show_metadata(archive_manager)).strip()
+    checksum_file = f"{archive_path}.checksums.txt"
+    digests = ChecksumManager.load(checksum_file) if os.path.exists(checksum_file) else {}
+    return archive_path, archive_manager.archive_type, st.st_size, st.st_mtime, metadata, \
+        [(member.name, member.size, member.mtime, digests.get(member.name)) for member in members]
+
+
+class ArchiveCatalog:
+    _initialized = set()
+    _init_lock = threading.Lock()
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    @classmethod
+    def default(cls):
+        return cls(config.catalog_path) if config.catalog_path else None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        with self._init_lock:
+            if self.db_path not in self._initialized:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(_SCHEMA)
+                self._initialized.add(self.db_path)
+        return conn
+
+    def is_current(self, archive_path):
+        archive_path = os.path.abspath(archive_path)
+        st = os.stat(archive_path)
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT size, mtime FROM archives WHERE path = ?", (archive_path,)).fetchone()
+        finally:
+            conn.close()
+        return row is not None and row[0] == st.st_size and row[1] == st.st_mtime
+
+    def index(self, archive_manager, force=False):
+        archive_path = os.path.abspath(archive_manager.archive_path)
+        if not force and self.is_current(archive_path):
+            return False
+        self._store([_describe_archive(archive_path, archive_manager.archive_type)])
+        return True
+
+    def update(self, archive_manager, replace=False, removed=None, metadata_changed=False):
+        # follows an operation from the checksum file it has just written instead of reading the archive again;
+        # an archive seen for the first time is indexed in full once
+        archive_path = os.path.abspath(archive_manager.archive_path)
+        checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+        digests = ChecksumManager.load(checksum_file) if os.path.exists(checksum_file) else {}
+        st = os.stat(archive_path)
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute("SELECT id FROM archives WHERE path = ?", (archive_path,)).fetchone()
+                if row is None and not replace:
+                    return self.index(archive_manager, force=True)
+                if row is None:
+                    archive_id = conn.execute("INSERT INTO archives (path, archive_type) VALUES (?, ?)",
+                                              (archive_path, archive_manager.archive_type)).lastrowid
+                else:
+                    archive_id = row[0]
+                if replace:
+                    conn.execute("DELETE FROM members WHERE archive_id = ?", (archive_id,))
+                for item in removed or ():
+                    conn.execute("DELETE FROM members WHERE archive_id = ? AND (name = ? OR substr(name, 1, ?) = ?)",
+                                 (archive_id, item, len(item) + 1, item + '/'))
+                known = dict(conn.execute("SELECT name, digest FROM members WHERE archive_id = ?", (archive_id,)))
+                changed = [(name, digest) for name, digest in digests.items() if known.get(name, False) != digest]
+                conn.executemany("DELETE FROM members WHERE archive_id = ? AND name = ?",
+                                 ((archive_id, name) for name, digest in changed if name in known))
+                conn.executemany(
+                    "INSERT INTO members (archive_id, name, basename, size, mtime, digest) VALUES (?, ?, ?, NULL, NULL, ?)",
+                    ((archive_id, name, name.rsplit('/', 1)[-1], digest) for name, digest in changed))
+                # the checksum file has no sizes or times and the metadata is only known as show_metadata prints it,
+                # so until those are filled in the archive is left without a stamp and the next scan indexes it again
+                stale = metadata_changed or replace and row is None or conn.execute(
+                    "SELECT 1 FROM members WHERE archive_id = ? AND size IS NULL LIMIT 1", (archive_id,)).fetchone()
+                conn.execute("UPDATE archives SET size = ?, mtime = ?, indexed_at = ? WHERE id = ?",
+                             (None if stale else st.st_size, None if stale else st.st_mtime, time.time(), archive_id))
+        finally:
+            conn.close()
+        return True
+
+    def forget(self, archive_path):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM archives WHERE path = ?", (os.path.abspath(archive_path),))
+        finally:
+            conn.close()
+
+    def scan(self, paths, workers=None, force=False):
+        candidates = []
+        for path in paths:
+            if os.path.isdir(path):
+                for root, dirs, files in os.walk(path):
+                    candidates.extend(os.path.join(root, file) for file in files)
+            else:
+                candidates.append(path)
+
+        jobs = []
+        for path in candidates:
+            archive_type = registry.detect_type(path)
+            if archive_type is None:
+                continue
+            if force or not self.is_current(path):
+                jobs.append((os.path.abspath(path), archive_type))
+
+        indexed = []
+        failed = []
+        if not jobs:
+            return 0, failed
+        workers = max(1, min(workers or config.catalog_scan_workers, len(jobs)))
+        # spawned rather than forked, so no lock held by another peer session is copied into a worker
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [(path, executor.submit(_describe_archive, path, archive_type)) for path, archive_type in jobs]
+            for path, future in futures:
+                try:
+                    indexed.append(future.result())
+                except Exception as e:
+                    failed.append((path, str(e)))
+        self._store(indexed)
+        return len(indexed), failed
+
+    def _store(self, described):
+        conn = self._connect()
+        try:
+            with conn:
+                for archive_path, archive_type, size, mtime, metadata, members in described:
+                    conn.execute("DELETE FROM archives WHERE path = ?", (archive_path,))
+                    archive_id = conn.execute(
+                        "INSERT INTO archives (path, archive_type, size, mtime, metadata, indexed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (archive_path, archive_type, size, mtime, metadata, time.time())).lastrowid
+                    conn.executemany(
+                        "INSERT INTO members (archive_id, name, basename, size, mtime, digest) VALUES (?, ?, ?, ?, ?, ?)",
+                        ((archive_id, name, name.rsplit('/', 1)[-1], member_size, member_mtime, digest)
+                         for name, member_size, member_mtime, digest in members))
+        finally:
+            conn.close()
+
+    def find(self, query, kind=FIND_NAME, limit=1000):
+        if kind not in _FIND_QUERIES:
+            raise ValueError(f"Unknown query kind: {kind}")
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT a.path, m.name, m.size, m.mtime, m.digest FROM members m "
+                "JOIN archives a ON a.id = m.archive_id "
+                f"WHERE {_FIND_QUERIES[kind]} ORDER BY a.path, m.name LIMIT :limit",
+                {'query': query, 'limit': limit}).fetchall()
+        finally:
+            conn.close()
@@ -0,0 +1,72 @@
+import json
+import os
+
+from cur import config
+
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+DIGESTS_SUFFIX = '.checkpoint.digests'
+
+OPERATION_CREATE = 'create'
+OPERATION_EXTRACT = 'extract'
+
+
+class Checkpoint:
+    def __init__(self, archive_path, interval=None):
+        self.path = archive_path + CHECKPOINT_SUFFIX
+        self.digests_path = archive_path + DIGESTS_SUFFIX
+        self.interval = config.checkpoint_interval if interval is None else interval
+        self.pending = 0
+        self._digest_log = None
+
+    def due(self, amount=0):
+        # counts bytes processed since the last save
+        self.pending += amount
+        return bool(self.interval) and self.pending >= self.interval
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def record(self, name, digest):
+        # digests of finished members go to an append-only log, so a save only writes what is new since the last
+        if not self.interval:
+            return
+        if self._digest_log is None:
+            self._digest_log = open(self.digests_path, 'ab')
+        self._digest_log.write(f"{name} {digest}\n".encode('utf-8'))
+
+    def load_digests(self, state):
+        # lines logged after the last save belong to members that are processed again, so they are cut off
+        digests = {}
+        if not os.path.exists(self.digests_path):
+            return digests
+        with open(self.digests_path, 'r+b') as f:
+            f.truncate(state.get('digests_size', 0))
+            for line in f:
+                name, digest = line.decode('utf-8').rstrip('\n').rsplit(' ', 1)
+                digests[name] = digest
+        return digests
+
+    def save(self, state):
+        if self._digest_log is not None:
+            self._digest_log.flush()
+            os.fsync(self._digest_log.fileno())
+            state['digests_size'] = self._digest_log.tell()
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.pending = 0
+
+    def clear(self):
+        if self._digest_log is not None:
+            self._digest_log.close()
+            self._digest_log = None
+        for path in (self.path, self.digests_path):
+            if os.path.exists(path):
+                os.remove(path)
@@ -1,17 +1,45 @@
 import hashlib
 import os
+import stat
+
+from cur.core.collector import FileCollector
+from cur.core.strategy import member_target, stored_name
+from cur.core.streams import iter_chunks, iter_file_chunks
 
 
 class ChecksumManager:
     @staticmethod
-    def calculate(files):
-        checksums = {}
-        for file in files:
-            hasher = hashlib.md5()
-            with open(file, 'rb') as f:
-                buf = f.read()
+    def new_hasher():
+        return hashlib.md5()
+
+    @staticmethod
+    def hash_stream(fileobj):
+        hasher = ChecksumManager.new_hasher()
+        for buf in iter_chunks(fileobj):
+            hasher.update(buf)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def hash_file(path):
+        hasher = ChecksumManager.new_hasher()
+        with open(path, 'rb') as f:
+            for buf in iter_file_chunks(f):
                 hasher.update(buf)
-            checksums[file] = hasher.hexdigest()
+        return hasher.hexdigest()
+
+    @staticmethod
+    def calculate(files, base_dir=None):
+        # keys are the archive names; with base_dir they are the names rar stores for paths relative to it,
+        # which loses any leading '../'
+        checksums = {}
+        for collected in FileCollector().collect(files):
+            if stat.S_ISLNK(collected.stat.st_mode) and not os.path.isfile(collected.path):
+                continue
+            if base_dir is None:
+                name = collected.arcname.replace(os.sep, '/')
+            else:
+                name = stored_name(os.path.relpath(os.path.abspath(collected.path), base_dir))
+            checksums[name] = ChecksumManager.hash_file(collected.path)
         return checksums
 
     @staticmethod
@@ -21,15 +49,39 @@ class ChecksumManager:
                 f.write(f"{file} {checksum}\n")
 
     @staticmethod
-    def verify(archive_path, checksum_file):
+    def load(checksum_file):
+        checksums = {}
         with open(checksum_file, 'r') as f:
-            checksums = {line.split()[0]: line.split()[1] for line in f}
+            for line in f:
+                line = line.rstrip('\n')
+                if line:
+                    file, checksum = line.rsplit(' ', 1)
+                    checksums[file] = checksum
+        return checksums
 
-        for file, checksum in checksums.items():
-            hasher = hashlib.md5()
-            with open(os.path.join(archive_path, file), 'rb') as f:
-                buf = f.read()
-                hasher.update(buf)
-            if hasher.hexdigest() != checksum:
+    @staticmethod
+    def update(checksum_file, added=None, removed=None):
+        if not os.path.exists(checksum_file):
+            return
+        checksums = ChecksumManager.load(checksum_file)
+        for item in removed or ():
+            for file in [f for f in checksums if f == item or f.startswith(item + '/')]:
+                del checksums[file]
+        checksums.update(added or {})
+        ChecksumManager.save(checksums, checksum_file)
+
+    @staticmethod
+    def compare(digests, checksum_file):
+        for file, checksum in ChecksumManager.load(checksum_file).items():
+            if digests.get(file) != checksum:
+                return False
+        return True
+
+    @staticmethod
+    def verify(archive_path, checksum_file):
+        for file, checksum in ChecksumManager.load(checksum_file).items():
+            # a key can never point outside the extracted tree, e.g. back at the original sources
+            path = member_target(archive_path, file)
+            if not os.path.isfile(path) or ChecksumManager.hash_file(path) != checksum:
                 return False
-        return True
\ No newline at end of file
+        return True
@@ -0,0 +1,77 @@
+import os
+import stat
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+
+CollectedFile = namedtuple('CollectedFile', ['path', 'arcname', 'stat'])
+
+
+class FileCollector:
+    ORDER_NONE = None
+    ORDER_SIZE = 'size'
+    ORDER_EXTENSION = 'extension'
+
+    def __init__(self, parallel=False, max_workers=None, order=None):
+        self.parallel = parallel
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.order = order
+
+    def collect(self, file_names_or_dir):
+        collected = []
+        for item in file_names_or_dir:
+            try:
+                st = os.stat(item)
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                collected.extend(self._collect_dir(item))
+            elif stat.S_ISREG(st.st_mode):
+                # a link is collected as the link itself; consumers decide whether to follow it
+                collected.append(CollectedFile(item, os.path.basename(item), os.lstat(item)))
+        return self._ordered(collected)
+
+    def _collect_dir(self, top):
+        if not self.parallel:
+            return self._walk(top, top)
+
+        files, subdirs = self._scan(top, top)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for result in executor.map(lambda d: self._walk(d, top), subdirs):
+                files.extend(result)
+        return files
+
+    def _walk(self, directory, top):
+        files = []
+        pending = [directory]
+        while pending:
+            found, subdirs = self._scan(pending.pop(), top)
+            files.extend(found)
+            pending.extend(reversed(subdirs))
+        return files
+
+    @staticmethod
+    def _scan(directory, top):
+        files = []
+        subdirs = []
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False) or entry.is_symlink() and not entry.is_dir():
+                    # links to files and dangling links are kept, links to directories are neither kept nor
+                    # walked, the same entries os.walk used to list as files
+                    files.append(CollectedFile(entry.path, os.path.relpath(entry.path, top),
+                                               entry.stat(follow_symlinks=False)))
+            except OSError:
+                continue
+        return files, subdirs
+
+    def _ordered(self, collected):
+        if self.order == self.ORDER_SIZE:
+            return sorted(collected, key=lambda f: f.stat.st_size)
+        if self.order == self.ORDER_EXTENSION:
+            return sorted(collected, key=lambda f: (os.path.splitext(f.arcname)[1].lower(), f.stat.st_size))
+        return collected
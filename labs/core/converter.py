@@ -0,0 +1,188 @@
+import os
+import shutil
+import stat
+import struct
+import tarfile
+import time
+import zipfile
+import zlib
+
+from cur.core.checksum import ChecksumManager
+from cur.core.streams import COPY_BUFSIZE, copy_file_region, copy_stream, iter_chunks
+from cur.core.tarstream import GzipMemberWriter, TarStreamWriter
+from cur.core.zipcopy import copy_zip_entry_raw, member_data_offset
+
+# a stored deflate block holds at most this many bytes
+_STORED_BLOCK_SIZE = 0xFFFF
+
+
+def _zipinfo_from_tarinfo(member, compression):
+    date_time = time.localtime(member.mtime)[0:6]
+    if date_time[0] < 1980:
+        date_time = (1980, 1, 1, 0, 0, 0)
+    name = member.name + '/' if member.isdir() else member.name
+    zinfo = zipfile.ZipInfo(name, date_time)
+    file_type = stat.S_IFDIR if member.isdir() else stat.S_IFREG
+    zinfo.external_attr = ((file_type | member.mode) & 0xFFFF) << 16
+    if member.isdir():
+        zinfo.external_attr |= 0x10
+        zinfo.compress_size = 0
+        zinfo.CRC = 0
+    else:
+        zinfo.file_size = member.size
+        zinfo.compress_type = compression
+    return zinfo
+
+
+def _tarinfo_from_zipinfo(info):
+    tarinfo = tarfile.TarInfo(info.filename.rstrip('/'))
+    tarinfo.mtime = int(time.mktime(info.date_time + (0, 0, -1)))
+    mode = (info.external_attr >> 16) & 0o7777
+    if info.is_dir():
+        tarinfo.type = tarfile.DIRTYPE
+        tarinfo.mode = mode or 0o755
+    else:
+        tarinfo.size = info.file_size
+        tarinfo.mode = mode or 0o644
+    return tarinfo
+
+
+def _can_splice(info):
+    return not info.flag_bits & 0x1 and info.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+
+
+def _copy_deflated(src_file, data_offset, info, raw, hasher=None):
+    # the payload is copied as is; it is only inflated when there is no digest for it yet
+    if hasher is None:
+        if copy_file_region(src_file, raw, data_offset, info.compress_size) != info.compress_size:
+            raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+        return
+    inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+    remaining = info.compress_size
+    src_file.seek(data_offset)
+    for buf in iter_chunks(src_file, info.compress_size):
+        raw.write(buf)
+        remaining -= len(buf)
+        data = inflater.decompress(buf, COPY_BUFSIZE)
+        while data:
+            hasher.update(data)
+            data = inflater.decompress(inflater.unconsumed_tail, COPY_BUFSIZE)
+    if remaining:
+        raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+
+
+def _copy_stored(src_file, data_offset, info, raw, hasher=None):
+    # wraps the data in stored deflate blocks, which costs no compression work
+    remaining = info.file_size
+    src_file.seek(data_offset)
+    for buf in iter_chunks(src_file, info.file_size, _STORED_BLOCK_SIZE):
+        remaining -= len(buf)
+        raw.write(struct.pack('<BHH', 0 if remaining else 1, len(buf), len(buf) ^ 0xFFFF))
+        raw.write(buf)
+        if hasher is not None:
+            hasher.update(buf)
+    if remaining:
+        raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+
+
+class ArchiveConverter:
+    EXTENSIONS = {'tar.gz': '.tar.gz', 'zip': '.zip'}
+
+    def __init__(self, archive_manager):
+        self.archive_manager = archive_manager
+
+    def convert(self, target_type, target_path):
+        source_type = self.archive_manager.archive_type
+        source_path = self.archive_manager.archive_path
+        if source_type not in self.EXTENSIONS or target_type not in self.EXTENSIONS:
+            return f"\033[31mConversion from {source_type} to {target_type} is not supported.\033[0m\n"
+        if not source_path.endswith(self.EXTENSIONS[source_type]):
+            return f"\033[31mInvalid archive type. Expected {source_type.upper()} archive.\033[0m\n"
+        if not target_path.endswith(self.EXTENSIONS[target_type]):
+            target_path += self.EXTENSIONS[target_type]
+
+        result_message = ""
+        try:
+            source_checksum_file = f"{source_path}.checksums.txt"
+            target_checksum_file = f"{target_path}.checksums.txt"
+            checksums = {}
+            skipped = []
+
+            if source_type == target_type == 'zip':
+                self._zip_to_zip(source_path, target_path)
+            elif source_type == target_type:
+                shutil.copyfile(source_path, target_path)
+            elif target_type == 'zip':
+                self._tar_to_zip(source_path, target_path, checksums, skipped)
+            else:
+                self._zip_to_tar(source_path, target_path, checksums)
+
+            if checksums:
+                ChecksumManager.save(checksums, target_checksum_file)
+            elif os.path.exists(source_checksum_file):
+                shutil.copyfile(source_checksum_file, target_checksum_file)
+
+            result_message += f"\033[32mArchive {source_path} converted to {target_path} successfully.\033[0m\n"
+            if os.path.exists(target_checksum_file):
+                result_message += f"\033[32mChecksums saved to {target_checksum_file}.\033[0m\n"
+            if skipped:
+                result_message += f"\033[33mSkipped {len(skipped)} member(s) that ZIP cannot store: {', '.join(skipped)}\033[0m\n"
+        except Exception as e:
+            result_message += f"\033[31mError converting {source_path} to {target_type.upper()}: {e}\033[0m\n"
+
+        return result_message
+
+    @staticmethod
+    def _zip_to_zip(source_path, target_path):
+        with open(source_path, 'rb') as src_file, zipfile.ZipFile(source_path, 'r') as src_zip:
+            with zipfile.ZipFile(target_path, 'w') as dst_zip:
+                for info in src_zip.infolist():
+                    copy_zip_entry_raw(src_file, info, dst_zip)
+                dst_zip.comment = src_zip.comment
+
+    @staticmethod
+    def _tar_to_zip(source_path, target_path, checksums, skipped):
+        with tarfile.open(source_path, "r:gz") as tar:
+            with zipfile.ZipFile(target_path, 'w', compression=zipfile.ZIP_DEFLATED) as zipf:
+                for member in tar:
+                    if member.isdir():
+                        zipf.mkdir(_zipinfo_from_tarinfo(member, zipf.compression))
+                    elif member.isreg():
+                        zinfo = _zipinfo_from_tarinfo(member, zipf.compression)
+                        hasher = ChecksumManager.new_hasher()
+                        with tar.extractfile(member) as src, zipf.open(zinfo, 'w') as dst:
+                            copy_stream(src, dst, hasher)
+                        checksums[member.name] = hasher.hexdigest()
+                    else:
+                        skipped.append(member.name)
+
+    @staticmethod
+    def _zip_to_tar(source_path, target_path, checksums):
+        # stored and deflated entries become gzip members of their own, between the members holding the
+        # tar headers and padding, so their data is never recompressed; the trailer takes the CRC and size
+        # from the central directory
+        source_checksum_file = f"{source_path}.checksums.txt"
+        known = ChecksumManager.load(source_checksum_file) if os.path.exists(source_checksum_file) else {}
+        with open(source_path, 'rb') as src_file, zipfile.ZipFile(source_path, 'r') as zipf, \
+                open(target_path, 'wb') as raw:
+            gz = GzipMemberWriter(raw)
+            tar = TarStreamWriter(gz)
+            for info in zipf.infolist():
+                tarinfo = _tarinfo_from_zipinfo(info)
+                tar.add_header(tarinfo)
+                if info.is_dir():
+                    continue
+                hasher = None if info.filename in known else ChecksumManager.new_hasher()
+                if info.file_size and _can_splice(info):
+                    copy = _copy_deflated if info.compress_type == zipfile.ZIP_DEFLATED else _copy_stored
+                    data_offset = member_data_offset(src_file, info)
+                    gz.write_deflated(lambda dst: copy(src_file, data_offset, info, dst, hasher),
+                                      info.CRC, info.file_size)
+                    tar.skip(info.file_size)
+                else:
+                    with zipf.open(info) as src:
+                        copy_stream(src, tar, hasher)
+                tar.pad()
+                checksums[tarinfo.name] = known[info.filename] if hasher is None else hasher.hexdigest()
+            tar.finish()
+            gz.close()
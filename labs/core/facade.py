@@ -8,6 +8,15 @@ class ArchiveFacade:
     def create_archive(self, file_names_or_dir):
         return self.archive_manager.create(file_names_or_dir)
 
+    def create_archive_from_stream(self, members):
+        return self.archive_manager.create_from_stream(members)
+
+    def add_streams(self, members):
+        return self.archive_manager.add_from_stream(members)
+
+    def resume_archive(self):
+        return self.archive_manager.resume()
+
     def extract_archive(self, extract_path):
         return self.archive_manager.extract(extract_path)
 
@@ -23,8 +32,14 @@ class ArchiveFacade:
     def show_metadata(self):
         return self.archive_manager.show_metadata()
 
-    def test_archive(self):
-        return self.archive_manager.test()
+    def test_archive(self, mode=None):
+        return self.archive_manager.test(mode)
+
+    def verify_archive(self, fail_fast=False):
+        return self.archive_manager.verify(fail_fast)
 
     def split_archive(self, part_size):
-        return self.archive_manager.split(part_size)
\ No newline at end of file
+        return self.archive_manager.split(part_size)
+
+    def convert_archive(self, target_type, target_path):
+        return self.archive_manager.convert(target_type, target_path)
\ No newline at end of file
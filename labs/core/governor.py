@@ -0,0 +1,181 @@
+import contextvars
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from cur import config
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+
+# smallest buffer worth waiting for when the memory budget is contended
+MIN_GRANT = 64 * 1024
+
+_priority = contextvars.ContextVar('trpz_priority', default=PRIORITY_NORMAL)
+
+
+def current_priority():
+    return _priority.get()
+
+
+@contextmanager
+def priority(level):
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _PriorityQueueing:
+    # waiters are served strictly by priority; a lower number goes first
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._waiting = Counter()
+
+    def _outranked(self, level):
+        return any(count for waiting_level, count in self._waiting.items() if waiting_level < level)
+
+
+class MemoryBudget(_PriorityQueueing):
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.used = 0
+        self.background_used = 0
+
+    def _share(self, level):
+        # background work may hold at most half of the budget, so interactive sessions always find room
+        return max(1, self.limit // 2) if level >= PRIORITY_BACKGROUND else self.limit
+
+    def _available(self, level):
+        available = self.limit - self.used
+        if level >= PRIORITY_BACKGROUND:
+            available = min(available, self._share(level) - self.background_used)
+        return available
+
+    def acquire(self, size, level=PRIORITY_NORMAL):
+        # grants whatever is free once at least a minimal buffer fits, so a busy budget means smaller buffers
+        # rather than waiting for other operations to finish
+        if not self.limit:
+            return size
+        size = max(1, min(size, self._share(level)))
+        floor = min(size, MIN_GRANT, max(1, self.limit // 16))
+        with self._cond:
+            self._waiting[level] += 1
+            try:
+                while self._outranked(level) or self._available(level) < floor:
+                    self._cond.wait()
+                size = min(size, self._available(level))
+                self.used += size
+                if level >= PRIORITY_BACKGROUND:
+                    self.background_used += size
+            finally:
+                self._waiting[level] -= 1
+                self._cond.notify_all()
+        return size
+
+    def release(self, size, level=PRIORITY_NORMAL):
+        if not self.limit:
+            return
+        with self._cond:
+            self.used -= size
+            if level >= PRIORITY_BACKGROUND:
+                self.background_used -= size
+            self._cond.notify_all()
+
+
+class TokenBucket(_PriorityQueueing):
+    def __init__(self, rate, burst=None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst or rate
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def consume(self, amount, level=PRIORITY_NORMAL):
+        if not self.rate or amount <= 0:
+            return
+        with self._cond:
+            self._waiting[level] += 1
+            try:
+                while True:
+                    if self._outranked(level):
+                        self._cond.wait()
+                        continue
+                    self._refill()
+                    # a request larger than the burst waits for a full bucket and leaves it in debt
+                    needed = min(amount, self.burst)
+                    if self._tokens >= needed:
+                        self._tokens -= amount
+                        return
+                    self._cond.wait((needed - self._tokens) / self.rate)
+            finally:
+                self._waiting[level] -= 1
+                self._cond.notify_all()
+
+
+class ResourceGovernor:
+    def __init__(self, memory_budget=None, disk_bandwidth=None, network_bandwidth=None):
+        self.memory = MemoryBudget(memory_budget)
+        self.disk = TokenBucket(disk_bandwidth)
+        self.network = TokenBucket(network_bandwidth)
+
+    @contextmanager
+    def buffer(self, size):
+        # yields the buffer size actually granted, which may be smaller than requested
+        level = _priority.get()
+        granted = self.memory.acquire(size, level)
+        try:
+            yield granted
+        finally:
+            self.memory.release(granted, level)
+
+    def throttle_disk(self, amount):
+        self.disk.consume(amount, _priority.get())
+
+    def throttle_network(self, amount):
+        self.network.consume(amount, _priority.get())
+
+
+class ThrottledSocket:
+    def __init__(self, sock, governor=None):
+        self.sock = sock
+        self.governor = governor or get_governor()
+
+    def sendall(self, data):
+        self.governor.throttle_network(len(data))
+        return self.sock.sendall(data)
+
+    def recv(self, bufsize):
+        data = self.sock.recv(bufsize)
+        self.governor.throttle_network(len(data))
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = ResourceGovernor(config.memory_budget, config.disk_bandwidth, config.network_bandwidth)
+        return _governor
+
+
+def set_governor(governor):
+    global _governor
+    with _governor_lock:
+        _governor = governor
@@ -1,42 +1,76 @@
-from cur.core.strategy import TarGzStrategy, ZipStrategy, RarStrategy, AceStrategy
+import os
+
+from cur.core import registry
+from cur.core.strategy import removal_items
 
 
 class ArchiveManager:
     def __init__(self, archive_type, archive_path):
+        if not archive_type:
+            archive_type = registry.detect_type(archive_path)
         self.archive_type = archive_type
         self.archive_path = archive_path
-        self.strategy = None
-
-        if archive_type == 'tar.gz':
-            self.strategy = TarGzStrategy.get_strategy()
-        elif archive_type == 'zip':
-            self.strategy = ZipStrategy.get_strategy()
-        elif archive_type == 'rar':
-            self.strategy = RarStrategy.get_strategy()
-        elif archive_type == 'ace':
-            self.strategy = AceStrategy.get_strategy()
+        self.strategy = registry.get_strategy(archive_type) if archive_type else None
 
 
     def split(self, part_size):
         return self.strategy.split(self, part_size)
 
     def create(self, file_names_or_dir):
-        return self.strategy.create(self, file_names_or_dir)
+        return self._update_catalog(self.strategy.create(self, file_names_or_dir), replace=True)
+
+    def create_from_stream(self, members):
+        return self._update_catalog(self.strategy.create_from_stream(self, members), replace=True)
+
+    def add_from_stream(self, members):
+        return self._update_catalog(self.strategy.add_from_stream(self, members))
+
+    def resume(self):
+        return self._update_catalog(self.strategy.resume(self), replace=True)
 
     def extract(self, extract_path):
         return self.strategy.extract(self, extract_path)
 
+    def iter_extract(self, extract_path):
+        return self.strategy.iter_extract(self, extract_path)
+
+    def iter_members(self):
+        return self.strategy.iter_members(self)
+
     def add(self, file_names_or_dir):
-        return self.strategy.add(self, file_names_or_dir)
+        return self._update_catalog(self.strategy.add(self, file_names_or_dir))
 
     def remove(self, items_to_remove):
-        return self.strategy.remove(self, items_to_remove)
+        items_to_remove = removal_items(items_to_remove)
+        return self._update_catalog(self.strategy.remove(self, items_to_remove), removed=items_to_remove)
 
     def edit_metadata(self, new_metadata):
-        return self.strategy.edit_metadata(self, new_metadata)
+        return self._update_catalog(self.strategy.edit_metadata(self, new_metadata), metadata_changed=True)
 
     def show_metadata(self):
         return self.strategy.show_metadata(self)
 
-    def test(self):
-        return self.strategy.test(self)
\ No newline at end of file
+    def test(self, mode=None):
+        return self.strategy.test(self, mode)
+
+    def verify(self, fail_fast=False):
+        return self.strategy.verify(self, fail_fast)
+
+    def convert(self, target_type, target_path):
+        from cur.core.converter import ArchiveConverter
+        result = ArchiveConverter(self).convert(target_type, target_path)
+        extension = ArchiveConverter.EXTENSIONS.get(target_type, '')
+        if not target_path.endswith(extension):
+            target_path += extension
+        return ArchiveManager(target_type, target_path)._update_catalog(result, replace=True)
+
+    def _update_catalog(self, result, replace=False, removed=None, metadata_changed=False):
+        from cur.core.catalog import ArchiveCatalog
+        catalog = ArchiveCatalog.default()
+        if catalog is None or not os.path.exists(self.archive_path):
+            return result
+        try:
+            catalog.update(self, replace=replace, removed=removed, metadata_changed=metadata_changed)
+        except Exception as e:
+            result += f"\033[33mCatalog not updated: {e}\033[0m\n"
+        return result
\ No newline at end of file
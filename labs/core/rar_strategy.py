@@ -0,0 +1,184 @@
+import os
+
+from cur.core.checksum import ChecksumManager
+from cur.core.rarbackend import RarBackend, RarError
+from cur.core.strategy import ArchiveStrategy, removal_items
+from cur.core.streams import split_file
+
+
+def _rar_items(archive_path, file_names_or_dir):
+    archive_dir = os.path.dirname(os.path.abspath(archive_path))
+    return archive_dir, [os.path.relpath(os.path.abspath(file_name), archive_dir) for file_name in file_names_or_dir]
+
+
+class RarStrategy(ArchiveStrategy):
+    backend = RarBackend()
+
+    def create(self, archive_manager, file_names_or_dir):
+        result_message = ""
+
+        if not archive_manager.archive_path.endswith(".rar"):
+            archive_manager.archive_path += ".rar"
+
+        try:
+            archive_dir, items = _rar_items(archive_manager.archive_path, file_names_or_dir)
+            self.backend.run('a', os.path.abspath(archive_manager.archive_path), items, cwd=archive_dir)
+            result_message += f"\033[32mRAR Archive {archive_manager.archive_path} created successfully.\033[0m\n"
+
+            checksums = ChecksumManager.calculate(file_names_or_dir, archive_dir)
+            checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+            ChecksumManager.save(checksums, checksum_file)
+            result_message += f"\033[32mChecksums saved to {checksum_file}.\033[0m\n"
+
+        except Exception as e:
+            result_message += f"\033[31mError creating RAR archive: {e}\033[0m\n"
+
+        return result_message
+
+    def split(self, archive_manager, part_size):
+        result_message = ""
+
+        if not archive_manager.archive_path.endswith(".rar"):
+            result_message += "\033[31mInvalid archive type. Expected RAR archive.\033[0m\n"
+            return result_message
+
+        try:
+            num_parts = split_file(archive_manager.archive_path, part_size)
+
+            result_message += f"\033[32mArchive split into {num_parts} parts successfully.\033[0m\n"
+        except Exception as e:
+            result_message += f"\033[31mError splitting RAR archive: {e}\033[0m\n"
+
+        return result_message
+
+    def extract(self, archive_manager, extract_path):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".rar"):
+                result_message += "\033[31mInvalid archive type. Expected RAR archive.\033[0m\n"
+                return result_message
+
+            self.backend.run('x', archive_manager.archive_path, switches=['-op' + os.path.join(extract_path, '')],
+                             use_unrar=True)
+            result_message += f"\033[32mRAR Archive {archive_manager.archive_path} extracted successfully.\033[0m\n"
+
+            checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+            if os.path.exists(checksum_file):
+                if ChecksumManager.verify(extract_path, checksum_file):
+                    result_message += "\033[32mChecksum verification successful.\033[0m\n"
+                else:
+                    result_message += "\033[31mChecksum verification failed. The extracted files may be corrupted.\033[0m\n"
+            else:
+                result_message += "\033[31mNo checksum file found. Skipping verification.\033[0m\n"
+
+        except Exception as e:
+            result_message += f"\033[31mError extracting RAR archive: {e}\033[0m\n"
+
+        return result_message
+
+    def add(self, archive_manager, file_names_or_dir):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".rar"):
+                result_message += "\033[31mInvalid archive type. Expected RAR archive.\033[0m\n"
+                return result_message
+
+            archive_dir, items = _rar_items(archive_manager.archive_path, file_names_or_dir)
+            self.backend.run('a', os.path.abspath(archive_manager.archive_path), items, cwd=archive_dir)
+            ChecksumManager.update(f"{archive_manager.archive_path}.checksums.txt",
+                                   added=ChecksumManager.calculate(file_names_or_dir, archive_dir))
+            result_message += f"\033[32mFiles added to {archive_manager.archive_path} successfully.\033[0m\n"
+
+        except Exception as e:
+            result_message += f"\033[31mError adding files to RAR archive: {e}\033[0m\n"
+
+        return result_message
+
+    def remove(self, archive_manager, items_to_remove):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".rar"):
+                result_message += "\033[31mInvalid archive type. Expected RAR archive.\033[0m\n"
+                return result_message
+
+            items_to_remove = removal_items(items_to_remove)
+            self.backend.run('d', archive_manager.archive_path, items_to_remove)
+            ChecksumManager.update(f"{archive_manager.archive_path}.checksums.txt", removed=items_to_remove)
+            result_message += f"\033[32mItems removed from {archive_manager.archive_path} successfully.\033[0m\n"
+
+        except Exception as e:
+            result_message += f"\033[31mError removing items from RAR archive: {e}\033[0m\n"
+
+        return result_message
+
+    def edit_metadata(self, archive_manager, new_metadata):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".rar"):
+                result_message += "\033[31mInvalid archive type. Expected RAR archive.\033[0m\n"
+                return result_message
+
+            comment_file_path = archive_manager.archive_path + ".txt"
+            try:
+                with open(comment_file_path, "w") as comment_file:
+                    comment_file.write(new_metadata)
+                self.backend.run('c', archive_manager.archive_path, switches=['-z' + comment_file_path])
+                result_message += f"\033[32mMetadata updated for {archive_manager.archive_path}.\033[0m\n"
+            finally:
+                if os.path.exists(comment_file_path):
+                    os.remove(comment_file_path)
+
+        except Exception as e:
+            result_message += f"\033[31mError editing metadata for RAR archive: {e}\033[0m\n"
+
+        return result_message
+
+    def show_metadata(self, archive_manager):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".rar"):
+                result_message += "\033[31mInvalid archive type. Expected RAR archive.\033[0m\n"
+                return result_message
+
+            comment_file_path = archive_manager.archive_path + ".txt"
+            if os.path.exists(comment_file_path):
+                with open(comment_file_path, "r") as comment_file:
+                    comment = comment_file.read()
+                    result_message += f"RAR Archive Comment:\n{comment}\n"
+            else:
+                result_message += "No comment file found for this RAR archive.\n"
+
+        except Exception as e:
+            result_message += f"\033[31mError showing metadata for {archive_manager.archive_path}: {e}\033[0m\n"
+
+        return result_message
+
+    def test(self, archive_manager, mode=None):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".rar"):
+                result_message += "\033[31mInvalid archive type. Expected RAR archive.\033[0m\n"
+                return result_message
+
+            try:
+                self.backend.run('t', archive_manager.archive_path, use_unrar=True)
+                result_message += f"\033[32mRAR Archive {archive_manager.archive_path} is valid and has no errors.\033[0m\n"
+            except RarError as e:
+                result_message += f"\033[31mRAR Archive {archive_manager.archive_path} may be corrupt: {e}\033[0m\n"
+
+        except Exception as e:
+            result_message += f"\033[31mError testing {archive_manager.archive_path}: {e}\033[0m\n"
+
+        return result_message
+
+    def verify(self, archive_manager, fail_fast=False):
+        try:
+            return "Verifying RAR archives without extraction is not supported."
+        except Exception as e:
+            return f"Error verifying RAR archive: {e}"
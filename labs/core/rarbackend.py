@@ -0,0 +1,141 @@
+import os
+import subprocess
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from cur import config
+
+RAR_EXIT_CODES = {
+    0: "success",
+    1: "non fatal error(s) occurred",
+    2: "a fatal error occurred",
+    3: "invalid checksum, data is damaged",
+    4: "attempt to modify a locked archive",
+    5: "write error",
+    6: "file open error",
+    7: "wrong command line option",
+    8: "not enough memory",
+    9: "file create error",
+    10: "no files matching the specified mask and options were found",
+    11: "wrong password",
+    255: "user stopped the process",
+}
+
+RarJob = namedtuple('RarJob', ['command', 'archive_path', 'items', 'switches', 'cwd', 'use_unrar'])
+RarJob.__new__.__defaults__ = ((), (), None, False)
+
+RarResult = namedtuple('RarResult', ['job', 'returncode', 'stdout', 'stderr'])
+
+
+class RarError(Exception):
+    def __init__(self, result):
+        self.result = result
+        description = RAR_EXIT_CODES.get(result.returncode, "unknown error")
+        details = (result.stderr or result.stdout or "").strip().splitlines()
+        message = f"rar '{result.job.command}' exited with code {result.returncode} ({description})"
+        if details:
+            message += f": {details[-1]}"
+        super().__init__(message)
+
+
+class RarBackend:
+    # UTF-8 list files, assume yes on all queries
+    COMMON_SWITCHES = ('-scfl', '-y')
+
+    def __init__(self, executable=None, unrar_executable=None, max_processes=None):
+        self.executable = executable
+        self.unrar_executable = unrar_executable
+        self.max_processes = max_processes
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._executor = None
+
+    def run(self, command, archive_path, items=(), switches=(), cwd=None, use_unrar=False):
+        job = RarJob(command, archive_path, tuple(items), tuple(switches), cwd, use_unrar)
+        return self._submit([job])[0].result()
+
+    def run_many(self, jobs):
+        # one result per job, in order: a RarResult, or the RarError of the invocation the job ended up in
+        results = []
+        for future in self._submit(jobs):
+            try:
+                results.append(future.result())
+            except RarError as e:
+                results.append(e)
+        return results
+
+    @staticmethod
+    def batch(jobs):
+        # consecutive jobs that differ only in their items become one invocation; each merged job comes
+        # with the positions of the jobs it stands for
+        batched = []
+        for index, job in enumerate(jobs):
+            if batched:
+                previous, indices = batched[-1]
+                if previous.items and job.items and previous._replace(items=()) == job._replace(items=()):
+                    batched[-1] = (previous._replace(items=previous.items + tuple(job.items)), indices + [index])
+                    continue
+            batched.append((job, [index]))
+        return batched
+
+    def _submit(self, jobs):
+        # jobs on one archive run in order, and those queued while rar is busy with it are batched together;
+        # different archives run concurrently, with at most max_processes rar processes at a time
+        futures = [Future() for _ in jobs]
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=max(1, self.max_processes or config.rar_max_processes),
+                                                    thread_name_prefix='trpz-rar')
+            for job, future in zip(jobs, futures):
+                key = os.path.abspath(os.path.join(job.cwd or '', job.archive_path))
+                queue = self._pending.get(key)
+                if queue is None:
+                    self._pending[key] = queue = []
+                    self._executor.submit(self._drain, key)
+                queue.append((job, future))
+        return futures
+
+    def _drain(self, key):
+        while True:
+            with self._lock:
+                queued = self._pending[key]
+                if not queued:
+                    del self._pending[key]
+                    return
+                self._pending[key] = []
+            for job, indices in self.batch([job for job, future in queued]):
+                try:
+                    result = self.run_job(job)
+                except BaseException as e:
+                    for index in indices:
+                        queued[index][1].set_exception(e)
+                else:
+                    for index in indices:
+                        queued[index][1].set_result(result)
+
+    def run_job(self, job):
+        executable = (self.unrar_executable or config.unrar_executable) if job.use_unrar \
+            else (self.executable or config.rar_executable)
+        args = [executable, job.command, *self.COMMON_SWITCHES, *job.switches, '--', job.archive_path]
+
+        list_file = None
+        try:
+            if job.items:
+                fd, list_file = tempfile.mkstemp(prefix='trpz-', suffix='.lst')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    for item in job.items:
+                        f.write(f"{item}\n")
+                args.append('@' + list_file)
+            completed = subprocess.run(args, cwd=job.cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                       stdin=subprocess.DEVNULL)
+        finally:
+            if list_file is not None:
+                os.remove(list_file)
+
+        result = RarResult(job, completed.returncode,
+                           completed.stdout.decode('utf-8', 'replace'), completed.stderr.decode('utf-8', 'replace'))
+        if result.returncode > 1:
+            raise RarError(result)
+        return result
@@ -0,0 +1,118 @@
+import importlib
+
+ENTRY_POINT_GROUP = 'trpz.strategies'
+SNIFF_SIZE = 16
+
+_strategies = {}
+_extensions = {}
+_signatures = []
+_entry_points_loaded = False
+
+
+class _StrategySpec:
+    def __init__(self, archive_type, target):
+        self.archive_type = archive_type
+        self.target = target
+        self.strategy_class = None if isinstance(target, (str, _EntryPointTarget)) else target
+
+    def load(self):
+        if self.strategy_class is None:
+            if isinstance(self.target, _EntryPointTarget):
+                self.strategy_class = self.target.entry_point.load()
+            else:
+                module_name, class_name = self.target.split(':')
+                self.strategy_class = getattr(importlib.import_module(module_name), class_name)
+        return self.strategy_class
+
+    @property
+    def class_name(self):
+        if self.strategy_class is not None:
+            return self.strategy_class.__name__
+        if isinstance(self.target, str):
+            return self.target.split(':')[1]
+        return None
+
+
+class _EntryPointTarget:
+    def __init__(self, entry_point):
+        self.entry_point = entry_point
+
+
+def register(archive_type, target, extensions=(), signatures=()):
+    # target is either the strategy class or a lazy "module:Class" reference
+    _strategies[archive_type] = _StrategySpec(archive_type, target)
+    for extension in extensions:
+        _extensions[extension.lower()] = archive_type
+    for offset, magic in signatures:
+        _signatures.append((offset, magic, archive_type))
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name not in _strategies:
+            _strategies[entry_point.name] = _StrategySpec(entry_point.name, _EntryPointTarget(entry_point))
+
+
+def _spec(archive_type):
+    spec = _strategies.get(archive_type)
+    if spec is None:
+        _load_entry_points()
+        spec = _strategies.get(archive_type)
+    return spec
+
+
+def is_registered(archive_type):
+    return _spec(archive_type) is not None
+
+
+def archive_types():
+    _load_entry_points()
+    return list(_strategies)
+
+
+def strategy_class(archive_type):
+    spec = _spec(archive_type)
+    return spec.load() if spec is not None else None
+
+
+def get_strategy(archive_type):
+    cls = strategy_class(archive_type)
+    return cls.get_strategy() if cls is not None else None
+
+
+def strategy_class_by_name(class_name):
+    for spec in _strategies.values():
+        if spec.class_name == class_name:
+            return spec.load()
+    return None
+
+
+def detect_type(archive_path):
+    name = archive_path.lower()
+    for extension in sorted(_extensions, key=len, reverse=True):
+        if name.endswith(extension):
+            return _extensions[extension]
+    try:
+        with open(archive_path, 'rb') as f:
+            head = f.read(SNIFF_SIZE)
+    except OSError:
+        return None
+    for offset, magic, archive_type in _signatures:
+        if head[offset:offset + len(magic)] == magic:
+            return archive_type
+    return None
+
+
+register('tar.gz', 'cur.core.targz_strategy:TarGzStrategy', extensions=('.tar.gz',),
+         signatures=[(0, b'\x1f\x8b')])
+register('zip', 'cur.core.zip_strategy:ZipStrategy', extensions=('.zip',),
+         signatures=[(0, b'PK\x03\x04'), (0, b'PK\x05\x06')])
+register('rar', 'cur.core.rar_strategy:RarStrategy', extensions=('.rar',),
+         signatures=[(0, b'Rar!\x1a\x07')])
+register('ace', 'cur.core.ace_strategy:AceStrategy', extensions=('.ace',),
+         signatures=[(7, b'**ACE**')])
@@ -0,0 +1,197 @@
+import contextvars
+import io
+import mmap
+import os
+import tempfile
+
+from cur import config
+from cur.core.governor import get_governor
+
+COPY_BUFSIZE = 1024 * 1024
+# large copies between regular files are handed to the kernel in steps of this size
+KERNEL_COPY_CHUNK = 16 * 1024 * 1024
+# data of unknown size is kept in memory up to this much, then spooled to a temporary file
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+_cancel_event = contextvars.ContextVar('trpz_cancel_event', default=None)
+
+
+class OperationCancelled(Exception):
+    def __init__(self):
+        super().__init__("operation cancelled")
+
+
+def set_cancel_event(event):
+    return _cancel_event.set(event)
+
+
+def check_cancelled():
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise OperationCancelled()
+
+
+class HashingReader:
+    # only hashes; whoever copies from it goes through iter_chunks, which charges the governor once per byte
+    def __init__(self, fileobj, hasher):
+        self.fileobj = fileobj
+        self.hasher = hasher
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.hasher.update(data)
+        return data
+
+    def hexdigest(self):
+        return self.hasher.hexdigest()
+
+
+class IterableReader:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            for chunk in self._chunks:
+                self._buffer += chunk
+        else:
+            while len(self._buffer) < size:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._buffer += chunk
+        data = bytes(self._buffer[:size] if size is not None and size >= 0 else self._buffer)
+        del self._buffer[:len(data)]
+        return data
+
+
+def open_source(source):
+    if hasattr(source, 'read'):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return IterableReader(source)
+
+
+def spool(src, hasher=None, max_memory=SPOOL_MAX_MEMORY):
+    # returns a rewound temporary copy of src and its size, for formats that need the size before the data
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    try:
+        size = copy_stream(src, spooled, hasher)
+        spooled.seek(0)
+    except BaseException:
+        spooled.close()
+        raise
+    return spooled, size
+
+
+def iter_chunks(src, size=None, bufsize=COPY_BUFSIZE):
+    # every bulk read goes through the governor: the buffer is charged to the memory budget
+    # and each chunk to the disk bandwidth
+    governor = get_governor()
+    with governor.buffer(bufsize) as bufsize:
+        remaining = size
+        while remaining is None or remaining > 0:
+            check_cancelled()
+            buf = src.read(bufsize if remaining is None else min(bufsize, remaining))
+            if not buf:
+                break
+            governor.throttle_disk(len(buf))
+            yield buf
+            if remaining is not None:
+                remaining -= len(buf)
+
+
+def iter_file_chunks(f, offset=0, size=None, bufsize=COPY_BUFSIZE):
+    # reads size bytes of a regular file starting at offset; large ranges are mapped and handed out as
+    # memoryview slices of the mapping, so consumers like hashers see the data without a bytes copy per chunk
+    try:
+        file_size = os.fstat(f.fileno()).st_size
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        file_size = None
+    if size is None and file_size is not None:
+        size = file_size - offset
+    threshold = config.large_io_threshold
+    if file_size is None or not threshold or size is None or size < threshold or offset + size > file_size:
+        f.seek(offset)
+        yield from iter_chunks(f, size, bufsize)
+        return
+
+    # mapped pages belong to the page cache, not to this process, so only bandwidth is charged to the governor
+    governor = get_governor()
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping, memoryview(mapping) as view:
+        if hasattr(mapping, 'madvise'):
+            mapping.madvise(mmap.MADV_SEQUENTIAL)
+        position = offset
+        end = offset + size
+        while position < end:
+            check_cancelled()
+            chunk = view[position:min(position + bufsize, end)]
+            try:
+                governor.throttle_disk(len(chunk))
+                yield chunk
+            finally:
+                # a slice still exported would keep the mapping from closing
+                chunk.release()
+            position = min(position + bufsize, end)
+
+
+def _kernel_copy(src_fd, dst_fd, src_offset, dst_offset, size):
+    governor = get_governor()
+    copied = 0
+    while copied < size:
+        check_cancelled()
+        count = min(KERNEL_COPY_CHUNK, size - copied)
+        governor.throttle_disk(count)
+        try:
+            done = os.copy_file_range(src_fd, dst_fd, count, src_offset + copied, dst_offset + copied)
+        except OSError:
+            if copied:
+                raise
+            # not supported for this pair of files, e.g. across file systems on older kernels
+            return None
+        if not done:
+            break
+        copied += done
+    return copied
+
+
+def copy_file_region(src, dst, offset, size, bufsize=COPY_BUFSIZE):
+    # copies size bytes of src starting at offset to the current position of dst; large regions between
+    # regular files never pass through Python buffers, everything else goes through copy_stream
+    threshold = config.large_io_threshold
+    if threshold and size >= threshold and hasattr(os, 'copy_file_range'):
+        try:
+            src_fd, dst_fd = src.fileno(), dst.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            pass
+        else:
+            dst.flush()
+            position = dst.tell()
+            copied = _kernel_copy(src_fd, dst_fd, offset, position, size)
+            if copied is not None:
+                dst.seek(position + copied)
+                return copied
+    src.seek(offset)
+    return copy_stream(src, dst, bufsize=bufsize, size=size)
+
+
+def split_file(path, part_size):
+    file_size = os.path.getsize(path)
+    num_parts = -(-file_size // part_size)
+    with open(path, 'rb') as f:
+        for i in range(num_parts):
+            with open(f"{path}.part{i + 1}", 'wb') as part_file:
+                copy_file_region(f, part_file, i * part_size, min(part_size, file_size - i * part_size))
+    return num_parts
+
+
+def copy_stream(src, dst, hasher=None, bufsize=COPY_BUFSIZE, size=None):
+    copied = 0
+    for buf in iter_chunks(src, size, bufsize):
+        if hasher is not None:
+            hasher.update(buf)
+        dst.write(buf)
+        copied += len(buf)
+    return copied
@@ -0,0 +1,467 @@
+import io
+import os
+import stat
+import tarfile
+import time
+from functools import lru_cache
+
+try:
+    import grp
+    import pwd
+except ImportError:
+    # not available on Windows; members are then written without owner names
+    grp = pwd = None
+
+from cur.core.checkpoint import OPERATION_CREATE, Checkpoint
+from cur.core.checksum import ChecksumManager
+from cur.core.collector import FileCollector
+from cur.core.streams import HashingReader, copy_stream, iter_chunks, split_file, spool
+from cur.core.strategy import TEST_DEEP, ArchiveStrategy, ChecksumMismatch, MemberInfo, member_target, removal_filter, \
+    removal_items, stream_members, test_report, verification_report
+from cur.core.tarstream import GzipMemberWriter, TarGzRewriter, TarStreamWriter
+
+
+@lru_cache(maxsize=None)
+def _user_name(uid):
+    if pwd is None:
+        return ""
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return ""
+
+
+@lru_cache(maxsize=None)
+def _group_name(gid):
+    if grp is None:
+        return ""
+    try:
+        return grp.getgrgid(gid).gr_name
+    except KeyError:
+        return ""
+
+
+def _tarinfo_from_collected(collected):
+    st = collected.stat
+    tarinfo = tarfile.TarInfo(collected.arcname.replace(os.sep, "/").lstrip("/"))
+    tarinfo.mode = stat.S_IMODE(st.st_mode)
+    tarinfo.uid = st.st_uid
+    tarinfo.gid = st.st_gid
+    tarinfo.uname = _user_name(st.st_uid)
+    tarinfo.gname = _group_name(st.st_gid)
+    tarinfo.mtime = st.st_mtime
+    if stat.S_ISLNK(st.st_mode):
+        # stored as a link, as tar.add does
+        tarinfo.type = tarfile.SYMTYPE
+        tarinfo.linkname = os.readlink(collected.path)
+    else:
+        tarinfo.size = st.st_size
+        tarinfo.type = tarfile.REGTYPE
+    return tarinfo
+
+
+def _collected_tar_members(collected_files, digests):
+    for collected in collected_files:
+        tarinfo = _tarinfo_from_collected(collected)
+        if not tarinfo.isreg():
+            yield tarinfo, None
+            continue
+        with open(collected.path, 'rb') as f:
+            reader = HashingReader(f, ChecksumManager.new_hasher())
+            yield tarinfo, reader
+        digests[tarinfo.name] = reader.hexdigest()
+
+
+def _streamed_tar_members(members, digests):
+    for name, reader, metadata in stream_members(members):
+        tarinfo = tarfile.TarInfo(name)
+        tarinfo.mode = metadata.get('mode', 0o644)
+        tarinfo.mtime = metadata.get('mtime', time.time())
+        tarinfo.type = tarfile.REGTYPE
+        hasher = ChecksumManager.new_hasher()
+        if metadata.get('size') is None:
+            # the tar header carries the size, so data of unknown length is spooled first
+            spooled, tarinfo.size = spool(reader, hasher)
+            with spooled:
+                yield tarinfo, spooled
+        else:
+            tarinfo.size = metadata['size']
+            yield tarinfo, HashingReader(reader, hasher)
+        digests[name] = hasher.hexdigest()
+
+
+def _write_checkpointed_tar(raw, state, collected_files, checkpoint, compresslevel=9):
+    # every checkpoint closes the current gzip member, so the file up to state['output_offset'] is a valid
+    # gzip stream that holds the first state['tar_offset'] bytes of the tar stream; the collected order is
+    # deterministic, so progress is the index of the next file, and finished digests live in the digest log
+    if state['next_index'] and len(collected_files) != state['collected']:
+        raise ValueError("the inputs changed since the checkpoint; start the archive again")
+    state['collected'] = len(collected_files)
+    gz = GzipMemberWriter(raw, compresslevel)
+    tar = TarStreamWriter(gz, state['tar_offset'])
+    completed = checkpoint.load_digests(state)
+
+    def save(current=None):
+        state.update(output_offset=gz.boundary(), tar_offset=tar.offset, current=current)
+        checkpoint.save(state)
+
+    def copy_data(current, hasher):
+        with open(current['path'], 'rb') as src:
+            if current['data_offset']:
+                # md5 state cannot be saved, so a resumed member rehashes the part already written
+                for buf in iter_chunks(src, current['data_offset']):
+                    hasher.update(buf)
+            for buf in iter_chunks(src, current['size'] - current['data_offset']):
+                hasher.update(buf)
+                tar.write(buf)
+                current['data_offset'] += len(buf)
+                if checkpoint.due(len(buf)) and current['data_offset'] < current['size']:
+                    save(current)
+        if current['data_offset'] != current['size']:
+            raise OSError(f"{current['path']} shrank while it was being archived")
+        tar.pad()
+        completed[current['name']] = hasher.hexdigest()
+        checkpoint.record(current['name'], completed[current['name']])
+
+    current = state.get('current')
+    if current:
+        st = os.stat(current['path'])
+        if os.path.abspath(collected_files[state['next_index']].path) != current['path'] \
+                or st.st_size != current['size'] or st.st_mtime != current['mtime']:
+            raise ValueError(f"{current['path']} changed since the checkpoint; start the archive again")
+        copy_data(current, ChecksumManager.new_hasher())
+        state['next_index'] += 1
+        if checkpoint.due():
+            save()
+
+    for collected in collected_files[state['next_index']:]:
+        tarinfo = _tarinfo_from_collected(collected)
+        tar.add_header(tarinfo)
+        if tarinfo.isreg():
+            copy_data({'name': tarinfo.name, 'path': os.path.abspath(collected.path), 'size': tarinfo.size,
+                       'mtime': collected.stat.st_mtime, 'data_offset': 0}, ChecksumManager.new_hasher())
+        state['next_index'] += 1
+        if checkpoint.due():
+            save()
+
+    tar.finish()
+    gz.close()
+    return completed
+
+
+def _extract_tar_members(tar, extract_path, digests):
+    for member in tar:
+        if member.isreg():
+            target = member_target(extract_path, member.name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            hasher = ChecksumManager.new_hasher()
+            with tar.extractfile(member) as src, open(target, 'wb') as dst:
+                copy_stream(src, dst, hasher)
+            os.chmod(target, member.mode & 0o777)
+            os.utime(target, (member.mtime, member.mtime))
+            digests[member.name] = hasher.hexdigest()
+        else:
+            tar.extract(member, extract_path)
+        yield member.name
+
+
+class TarGzStrategy(ArchiveStrategy):
+    # grouping by extension keeps similar content together in the gzip window
+    collector = FileCollector(parallel=True, order=FileCollector.ORDER_EXTENSION)
+
+    def create(self, archive_manager, file_names_or_dir):
+        if not archive_manager.archive_path.endswith(".tar.gz"):
+            archive_manager.archive_path += ".tar.gz"
+
+        try:
+            # sources are stored absolute so that resume() rebuilds the same member names from any directory
+            state = {'operation': OPERATION_CREATE, 'sources': [os.path.abspath(item) for item in file_names_or_dir],
+                     'output_offset': 0, 'tar_offset': 0, 'next_index': 0, 'current': None}
+            checkpoint = Checkpoint(archive_manager.archive_path)
+            # a checkpoint left by an earlier, abandoned create must not be resumed into this archive
+            checkpoint.clear()
+            with open(archive_manager.archive_path, 'wb') as raw:
+                completed = _write_checkpointed_tar(raw, state, self.collector.collect(state['sources']), checkpoint)
+            checkpoint.clear()
+
+            checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+            ChecksumManager.save(completed, checksum_file)
+
+            return f"\033[32mChecksums saved to {checksum_file}.\nArchive {archive_manager.archive_path} created successfully.\033[0m"
+        except Exception as e:
+            return f"\033[31mError creating TAR.GZ archive: {e}\033[0m"
+
+    def resume(self, archive_manager):
+        try:
+            checkpoint = Checkpoint(archive_manager.archive_path)
+            if not checkpoint.exists():
+                return f"\033[33mNo checkpoint found for {archive_manager.archive_path}. Nothing to resume.\033[0m"
+            state = checkpoint.load()
+            if state['operation'] != OPERATION_CREATE:
+                return f"\033[31mCannot resume '{state['operation']}' for TAR.GZ archives.\033[0m"
+
+            with open(archive_manager.archive_path, 'r+b') as raw:
+                # whatever was written after the last checkpoint is an incomplete gzip member
+                raw.truncate(state['output_offset'])
+                raw.seek(state['output_offset'])
+                completed = _write_checkpointed_tar(raw, state, self.collector.collect(state['sources']), checkpoint)
+            checkpoint.clear()
+
+            checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+            ChecksumManager.save(completed, checksum_file)
+
+            return f"\033[32mChecksums saved to {checksum_file}.\nArchive {archive_manager.archive_path} created successfully.\033[0m"
+        except Exception as e:
+            return f"\033[31mError resuming TAR.GZ archive: {e}\033[0m"
+
+    def create_from_stream(self, archive_manager, members):
+        if not archive_manager.archive_path.endswith(".tar.gz"):
+            archive_manager.archive_path += ".tar.gz"
+
+        try:
+            checksums = {}
+            with open(archive_manager.archive_path, 'wb') as raw:
+                gz = GzipMemberWriter(raw)
+                tar = TarStreamWriter(gz)
+                for tarinfo, fileobj in _streamed_tar_members(members, checksums):
+                    tar.add_header(tarinfo)
+                    if copy_stream(fileobj, tar, size=tarinfo.size) != tarinfo.size:
+                        raise OSError("unexpected end of data")
+                    tar.pad()
+                tar.finish()
+                gz.close()
+
+            checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+            ChecksumManager.save(checksums, checksum_file)
+
+            return f"\033[32mChecksums saved to {checksum_file}.\nArchive {archive_manager.archive_path} created successfully.\033[0m"
+        except Exception as e:
+            return f"\033[31mError creating TAR.GZ archive: {e}\033[0m"
+
+    def add_from_stream(self, archive_manager, members):
+        try:
+            if not archive_manager.archive_path.endswith(".tar.gz"):
+                return "\033[31mInvalid archive type. Expected TAR.GZ archive.\033[0m"
+
+            added = {}
+            temp_archive = archive_manager.archive_path + '.temp'
+            TarGzRewriter(archive_manager.archive_path, temp_archive).rewrite(
+                lambda name: True, _streamed_tar_members(members, added))
+
+            os.remove(archive_manager.archive_path)
+            os.rename(temp_archive, archive_manager.archive_path)
+            ChecksumManager.update(f"{archive_manager.archive_path}.checksums.txt", added=added)
+
+            return f"\033[32mStreams added to {archive_manager.archive_path} successfully.\033[0m"
+        except Exception as e:
+            return f"\033[31mError adding streams to TAR.GZ archive: {e}\033[0m"
+
+    def split(self, archive_manager, part_size):
+        if not archive_manager.archive_path.endswith(".tar.gz"):
+            return "\033[31mInvalid archive type. Expected TAR.GZ archive.\033[0m"
+
+        try:
+            num_parts = split_file(archive_manager.archive_path, part_size)
+
+            return f"\033[32mArchive split into {num_parts} parts successfully.\033[0m"
+        except Exception as e:
+            return f"\033[31mError splitting TAR.GZ archive: {e}\033[0m"
+
+    def extract(self, archive_manager, extract_path):
+        messages = []
+        try:
+            if not archive_manager.archive_path.endswith(".tar.gz"):
+                return "\033[31mInvalid archive type. Expected TAR.GZ archive.\033[0m"
+
+            digests = {}
+            with tarfile.open(archive_manager.archive_path, "r:gz") as tar:
+                for _ in _extract_tar_members(tar, extract_path, digests):
+                    pass
+
+            checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+            if os.path.exists(checksum_file):
+                if not ChecksumManager.compare(digests, checksum_file):
+                    messages.append(
+                        "\033[31mChecksum verification failed. The extracted files may be corrupted.\033[0m")
+                else:
+                    messages.append("\033[32mChecksum verification successful.\033[0m")
+            else:
+                messages.append("\033[33mNo checksum file found. Skipping verification.\033[0m")
+
+            messages.append(f"Archive extracted to {extract_path}.")
+            return '\n'.join(messages)
+        except Exception as e:
+            return f"\033[31mError extracting TAR.GZ archive: {e}\033[0m"
+
+    def iter_extract(self, archive_manager, extract_path):
+        if not archive_manager.archive_path.endswith(".tar.gz"):
+            raise ValueError("Invalid archive type. Expected TAR.GZ archive.")
+
+        digests = {}
+        with tarfile.open(archive_manager.archive_path, "r:gz") as tar:
+            yield from _extract_tar_members(tar, extract_path, digests)
+
+        checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+        if os.path.exists(checksum_file) and not ChecksumManager.compare(digests, checksum_file):
+            raise ChecksumMismatch("Checksum verification failed. The extracted files may be corrupted.")
+
+    def add(self, archive_manager, file_names_or_dir):
+        try:
+            if not archive_manager.archive_path.endswith(".tar.gz"):
+                return "\033[31mInvalid archive type. Expected TAR.GZ archive.\033[0m"
+
+            added = {}
+            temp_archive = archive_manager.archive_path + '.temp'
+            new_members = _collected_tar_members(self.collector.collect(file_names_or_dir), added)
+            TarGzRewriter(archive_manager.archive_path, temp_archive).rewrite(lambda name: True, new_members)
+
+            os.remove(archive_manager.archive_path)
+            os.rename(temp_archive, archive_manager.archive_path)
+            ChecksumManager.update(f"{archive_manager.archive_path}.checksums.txt", added=added)
+
+            return f"\033[32mFiles added to {archive_manager.archive_path} successfully.\033[0m"
+        except Exception as e:
+            return f"\033[31mError adding files to TAR.GZ archive: {e}\033[0m"
+
+    def remove(self, archive_manager, items_to_remove):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".tar.gz"):
+                result_message += "\033[31mInvalid archive type. Expected TAR.GZ archive.\033[0m\n"
+                return result_message
+
+            items_to_remove = removal_items(items_to_remove)
+            temp_archive = archive_manager.archive_path + '.temp'
+            TarGzRewriter(archive_manager.archive_path, temp_archive).rewrite(removal_filter(items_to_remove))
+
+            os.remove(archive_manager.archive_path)
+            os.rename(temp_archive, archive_manager.archive_path)
+            ChecksumManager.update(f"{archive_manager.archive_path}.checksums.txt", removed=items_to_remove)
+
+            result_message += f"\033[32mItems removed from {archive_manager.archive_path} successfully.\033[0m\n"
+        except Exception as e:
+            result_message += f"\033[31mError removing items from TAR.GZ archive: {e}\033[0m\n"
+
+        return result_message
+
+    def edit_metadata(self, archive_manager, new_metadata):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".tar.gz"):
+                result_message += "\033[31mInvalid archive type. Expected TAR.GZ archive.\033[0m\n"
+                return result_message
+
+            metadata_file_name = os.path.basename(archive_manager.archive_path) + "_metadata.txt"
+            temp_archive_path = archive_manager.archive_path + ".temp"
+
+            metadata = new_metadata.encode('utf-8')
+            metadata_info = tarfile.TarInfo(metadata_file_name)
+            metadata_info.size = len(metadata)
+            metadata_info.mtime = int(time.time())
+            metadata_info.mode = 0o644
+
+            TarGzRewriter(archive_manager.archive_path, temp_archive_path).rewrite(
+                lambda name: name != metadata_file_name, [(metadata_info, io.BytesIO(metadata))])
+
+            os.remove(archive_manager.archive_path)
+            os.rename(temp_archive_path, archive_manager.archive_path)
+
+            result_message += f"\033[32mMetadata updated for {archive_manager.archive_path}.\033[0m\n"
+        except Exception as e:
+            result_message += f"\033[31mError editing metadata for TAR.GZ archive: {e}\033[0m\n"
+
+        return result_message
+
+    def iter_members(self, archive_manager):
+        with tarfile.open(archive_manager.archive_path, "r:gz") as tar:
+            for member in tar:
+                if member.isreg():
+                    yield MemberInfo(member.name, member.size, member.mtime)
+
+    def show_metadata(self, archive_manager):
+        result_message = ""
+        try:
+            if not archive_manager.archive_path.endswith(".tar.gz"):
+                result_message += "\033[31mInvalid archive type. Expected TAR.GZ archive.\033[0m\n"
+                return result_message
+
+            metadata_file_name = os.path.basename(archive_manager.archive_path) + "_metadata.txt"
+            with tarfile.open(archive_manager.archive_path, "r:gz") as tar:
+                if metadata_file_name in tar.getnames():
+                    member = tar.getmember(metadata_file_name)
+                    with tar.extractfile(member) as metadata_file:
+                        metadata_content = metadata_file.read().decode('utf-8')
+                        result_message += f"\033[32mTAR.GZ Metadata:\n{metadata_content}\033[0m\n"
+                else:
+                    result_message += "\033[33mNo metadata file found in this TAR.GZ archive.\033[0m\n"
+        except Exception as e:
+            result_message += f"\033[31mError showing metadata for {archive_manager.archive_path}: {e}\033[0m\n"
+
+        return result_message
+
+    def test(self, archive_manager, mode=None):
+        result_message = ""
+        try:
+            if not archive_manager.archive_path.endswith(".tar.gz"):
+                result_message += "\033[31mInvalid archive type. Expected TAR.GZ archive.\033[0m\n"
+                return result_message
+
+            checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+            deep = mode == TEST_DEEP
+            expected = ChecksumManager.load(checksum_file) if deep and os.path.exists(checksum_file) else {}
+
+            bad_members = []
+            # add appends, so only the last member of a name is what extract leaves behind
+            digests = {}
+            with tarfile.open(archive_manager.archive_path, "r:gz") as tar:
+                try:
+                    for member in tar:
+                        if not deep or not member.isreg():
+                            continue
+                        with tar.extractfile(member) as src:
+                            digests[member.name] = ChecksumManager.hash_stream(src)
+                    if deep:
+                        for _ in iter_chunks(tar.fileobj):
+                            pass
+                except Exception as e:
+                    bad_members.append(("<stream>", f"unreadable after {len(digests)} member(s): {e}"))
+                else:
+                    bad_members.extend((name, "checksum mismatch") for name, digest in digests.items()
+                                       if name in expected and digest != expected[name])
+                    bad_members.extend((name, "missing from archive") for name in expected if name not in digests)
+
+            result_message += test_report("TAR.GZ", archive_manager.archive_path, bad_members)
+        except Exception as e:
+            result_message += f"\033[31mError testing {archive_manager.archive_path}: {e}\033[0m\n"
+
+        return result_message
+
+    def verify(self, archive_manager, fail_fast=False):
+        try:
+            if not archive_manager.archive_path.endswith(".tar.gz"):
+                return "\033[31mInvalid archive type. Expected TAR.GZ archive.\033[0m\n"
+
+            checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+            if not os.path.exists(checksum_file):
+                return "\033[33mNo checksum file found. Nothing to verify against.\033[0m\n"
+            expected = ChecksumManager.load(checksum_file)
+
+            # add appends, so a name may occur more than once and only its last member counts; whether a member
+            # is the last is known only at the end of the stream, so fail_fast just shortens the report
+            digests = {}
+            with tarfile.open(archive_manager.archive_path, "r:gz") as tar:
+                for member in tar:
+                    if not member.isreg() or member.name not in expected:
+                        continue
+                    with tar.extractfile(member) as src:
+                        digests[member.name] = ChecksumManager.hash_stream(src)
+
+            mismatched = [name for name, digest in digests.items() if digest != expected[name]]
+            if mismatched and fail_fast:
+                return verification_report(archive_manager.archive_path, len(digests), mismatched[:1], [])
+            missing = [name for name in expected if name not in digests]
+            return verification_report(archive_manager.archive_path, len(digests), mismatched, missing)
+        except Exception as e:
+            return f"\033[31mError verifying {archive_manager.archive_path}: {e}\033[0m\n"
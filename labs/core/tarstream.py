@@ -0,0 +1,211 @@
+import gzip
+import os
+import re
+import struct
+import tarfile
+
+from cur.core.streams import COPY_BUFSIZE, iter_chunks
+
+BLOCKSIZE = tarfile.BLOCKSIZE
+RECORDSIZE = tarfile.RECORDSIZE
+NUL_BLOCK = tarfile.NUL * BLOCKSIZE
+
+_EXTENDED_TYPES = (tarfile.GNUTYPE_LONGNAME, tarfile.GNUTYPE_LONGLINK, tarfile.XHDTYPE, tarfile.SOLARIS_XHDTYPE)
+_PAX_RECORD = re.compile(rb"(\d+) ([^=]+)=")
+# magic, deflate, no flags, no mtime, no extra flags, unknown OS
+_GZIP_MEMBER_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+
+
+def _padded(size):
+    return -(-size // BLOCKSIZE) * BLOCKSIZE
+
+
+def _has_data(tarinfo):
+    # same rule tarfile uses when skipping to the next header
+    return tarinfo.isreg() or tarinfo.type not in tarfile.SUPPORTED_TYPES
+
+
+def _pax_records(data):
+    # only the records that decide where the member data ends and what the member is called
+    records = {}
+    pos = 0
+    while pos < len(data):
+        match = _PAX_RECORD.match(data, pos)
+        if match is None:
+            break
+        length = int(match.group(1))
+        keyword = match.group(2)
+        if keyword in (b'path', b'size'):
+            records[keyword.decode('ascii')] = data[match.end():pos + length - 1].decode('utf-8', 'surrogateescape')
+        pos += length
+    return records
+
+
+class TarGzRewriter:
+    def __init__(self, source_path, target_path, compresslevel=9, bufsize=COPY_BUFSIZE):
+        self.source_path = source_path
+        self.target_path = target_path
+        self.compresslevel = compresslevel
+        self.bufsize = bufsize - bufsize % BLOCKSIZE or BLOCKSIZE
+        self.written = 0
+
+    def rewrite(self, keep, append=()):
+        kept = dropped = 0
+        with gzip.open(self.source_path, 'rb') as src, \
+                gzip.open(self.target_path, 'wb', compresslevel=self.compresslevel) as dst:
+            pending = []
+            pending_name = None
+            pending_size = None
+            while True:
+                header = self._read_exact(src, BLOCKSIZE, allow_eof=True)
+                if not header or header == NUL_BLOCK:
+                    break
+                tarinfo = tarfile.TarInfo.frombuf(header, tarfile.ENCODING, "surrogateescape")
+
+                if tarinfo.type in _EXTENDED_TYPES:
+                    data = self._read_exact(src, _padded(tarinfo.size))
+                    pending.append(header + data)
+                    if tarinfo.type == tarfile.GNUTYPE_LONGNAME:
+                        pending_name = tarfile.nts(data[:tarinfo.size], tarfile.ENCODING, "surrogateescape")
+                    elif tarinfo.type != tarfile.GNUTYPE_LONGLINK:
+                        records = _pax_records(data[:tarinfo.size])
+                        pending_name = records.get('path', pending_name)
+                        # members of 8 GiB and more have size 0 in the ustar field and the real size here
+                        if 'size' in records:
+                            pending_size = int(records['size'])
+                    continue
+
+                if tarinfo.type == tarfile.XGLTYPE:
+                    self._write(dst, header)
+                    self._copy_blocks(src, dst, _padded(tarinfo.size))
+                    continue
+
+                raw_headers = pending + [header]
+                # old GNU sparse members carry extension headers until isextended is cleared
+                extended = header[482]
+                while tarinfo.type == tarfile.GNUTYPE_SPARSE and extended:
+                    block = self._read_exact(src, BLOCKSIZE)
+                    raw_headers.append(block)
+                    extended = block[504]
+
+                name = (pending_name or tarinfo.name).rstrip('/')
+                size = pending_size if pending_size is not None else tarinfo.size
+                data_size = _padded(size) if _has_data(tarinfo) else 0
+                if keep(name):
+                    for raw in raw_headers:
+                        self._write(dst, raw)
+                    self._copy_blocks(src, dst, data_size)
+                    kept += 1
+                else:
+                    self._copy_blocks(src, None, data_size)
+                    dropped += 1
+                pending = []
+                pending_name = None
+                pending_size = None
+
+            for tarinfo, fileobj in append:
+                self._write(dst, tarinfo.tobuf(tarfile.DEFAULT_FORMAT, tarfile.ENCODING, "surrogateescape"))
+                if tarinfo.isreg() and tarinfo.size:
+                    self._copy_member_data(fileobj, dst, tarinfo.size)
+                kept += 1
+
+            self._write(dst, NUL_BLOCK * 2)
+            remainder = self.written % RECORDSIZE
+            if remainder:
+                self._write(dst, tarfile.NUL * (RECORDSIZE - remainder))
+        return kept, dropped
+
+    def _write(self, dst, data):
+        dst.write(data)
+        self.written += len(data)
+
+    def _read_exact(self, src, size, allow_eof=False):
+        data = src.read(size)
+        while len(data) < size:
+            more = src.read(size - len(data))
+            if not more:
+                if allow_eof and not data:
+                    return data
+                raise tarfile.ReadError("unexpected end of data")
+            data += more
+        return data
+
+    def _copy_blocks(self, src, dst, size):
+        for buf in iter_chunks(src, size, self.bufsize):
+            if dst is not None:
+                self._write(dst, buf)
+            size -= len(buf)
+        if size:
+            raise tarfile.ReadError("unexpected end of data")
+
+    def _copy_member_data(self, fileobj, dst, size):
+        remaining = size
+        for buf in iter_chunks(fileobj, size, self.bufsize):
+            self._write(dst, buf)
+            remaining -= len(buf)
+        if remaining:
+            raise OSError("unexpected end of data")
+        padding = _padded(size) - size
+        if padding:
+            self._write(dst, tarfile.NUL * padding)
+
+
+class GzipMemberWriter:
+    # writes a multi-member gzip stream; boundary() ends the current member and syncs the file,
+    # so everything before the returned offset can be read back even if the process dies afterwards
+    def __init__(self, raw, compresslevel=9):
+        self.raw = raw
+        self.compresslevel = compresslevel
+        self._member = None
+
+    def write(self, data):
+        if self._member is None:
+            self._member = gzip.GzipFile(filename='', mode='wb', fileobj=self.raw, compresslevel=self.compresslevel)
+        self._member.write(data)
+
+    def write_deflated(self, write_payload, crc, size):
+        # adds a member around data that is already raw deflate, as a deflated zip entry is;
+        # write_payload(raw) writes it to the file, crc and size describe the uncompressed data
+        self.close()
+        self.raw.write(_GZIP_MEMBER_HEADER)
+        write_payload(self.raw)
+        self.raw.write(struct.pack('<II', crc & 0xFFFFFFFF, size & 0xFFFFFFFF))
+
+    def boundary(self):
+        self.close()
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        return self.raw.tell()
+
+    def close(self):
+        if self._member is not None:
+            self._member.close()
+            self._member = None
+
+
+class TarStreamWriter:
+    def __init__(self, dst, offset=0):
+        self.dst = dst
+        self.offset = offset
+
+    def write(self, data):
+        self.dst.write(data)
+        self.offset += len(data)
+
+    def add_header(self, tarinfo):
+        self.write(tarinfo.tobuf(tarfile.DEFAULT_FORMAT, tarfile.ENCODING, "surrogateescape"))
+
+    def skip(self, size):
+        # accounts for member data that was written to the underlying file without going through this writer
+        self.offset += size
+
+    def pad(self):
+        remainder = self.offset % BLOCKSIZE
+        if remainder:
+            self.write(tarfile.NUL * (BLOCKSIZE - remainder))
+
+    def finish(self):
+        self.write(NUL_BLOCK * 2)
+        remainder = self.offset % RECORDSIZE
+        if remainder:
+            self.write(tarfile.NUL * (RECORDSIZE - remainder))
@@ -0,0 +1,436 @@
+import multiprocessing
+import os
+import stat
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+from cur.core.checkpoint import OPERATION_EXTRACT, Checkpoint
+from cur.core.checksum import ChecksumManager
+from cur.core.collector import FileCollector
+from cur.core.streams import copy_stream, iter_chunks, split_file
+from cur.core.strategy import TEST_QUICK, ArchiveStrategy, ChecksumMismatch, MemberInfo, member_target, removal_filter, \
+    removal_items, stream_members, test_report, verification_report
+from cur.core.zipcopy import copy_zip_entry_raw
+
+
+def _zip_date_time(mtime):
+    date_time = time.localtime(mtime)[0:6]
+    if date_time[0] < 1980:
+        date_time = (1980, 1, 1, 0, 0, 0)
+    return date_time
+
+
+def _zipinfo_from_collected(zipf, collected):
+    st = collected.stat
+    if stat.S_ISLNK(st.st_mode):
+        # zip members hold the file a link points to, as zipf.write stored them
+        st = os.stat(collected.path)
+    zinfo = zipfile.ZipInfo(collected.arcname.replace(os.sep, "/").lstrip("/"), _zip_date_time(st.st_mtime))
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    zinfo.file_size = st.st_size
+    zinfo.compress_type = zipf.compression
+    zinfo._compresslevel = zipf.compresslevel
+    return zinfo
+
+
+def _add_to_zip(zipf, collected_files, digests):
+    for collected in collected_files:
+        zinfo = _zipinfo_from_collected(zipf, collected)
+        hasher = ChecksumManager.new_hasher()
+        with open(collected.path, 'rb') as src, zipf.open(zinfo, 'w') as dst:
+            copy_stream(src, dst, hasher)
+        digests[zinfo.filename] = hasher.hexdigest()
+
+
+def _add_streams_to_zip(zipf, members, digests):
+    for name, reader, metadata in stream_members(members):
+        zinfo = zipfile.ZipInfo(name, _zip_date_time(metadata.get('mtime', time.time())))
+        zinfo.external_attr = (stat.S_IFREG | metadata.get('mode', 0o644)) << 16
+        zinfo.compress_type = zipf.compression
+        zinfo._compresslevel = zipf.compresslevel
+        size = metadata.get('size')
+        if size is not None:
+            zinfo.file_size = size
+        hasher = ChecksumManager.new_hasher()
+        # without a known size the member may still outgrow 4 GiB, so reserve the ZIP64 fields up front;
+        # zipfile writes sizes back into the local header, or into a data descriptor if the output cannot seek
+        with zipf.open(zinfo, 'w', force_zip64=size is None) as dst:
+            copy_stream(reader, dst, hasher)
+        digests[name] = hasher.hexdigest()
+
+
+def _extract_zip_members(zipf, extract_path, digests, start=0):
+    # members before start were extracted before a checkpoint; progress goes by position because add
+    # appends a second entry under the same name, and that later entry has to overwrite the earlier one
+    for index, info in enumerate(zipf.infolist()[start:], start):
+        target = member_target(extract_path, info.filename)
+        if info.is_dir():
+            os.makedirs(target, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            hasher = ChecksumManager.new_hasher()
+            with zipf.open(info) as src, open(target, 'wb') as dst:
+                copy_stream(src, dst, hasher)
+            digests[info.filename] = hasher.hexdigest()
+        yield index, info
+
+
+def _verify_zip_names(archive_path, names, expected, stop_event, fail_fast):
+    mismatched = []
+    with zipfile.ZipFile(archive_path, 'r') as zipf:
+        for name in names:
+            if stop_event.is_set():
+                break
+            try:
+                with zipf.open(name) as src:
+                    digest = ChecksumManager.hash_stream(src)
+            except (zipfile.BadZipFile, zlib.error, EOFError, OSError):
+                # a corrupt or truncated member counts as a mismatch and the other members are still checked
+                digest = None
+            if digest != expected[name]:
+                mismatched.append(name)
+                if fail_fast:
+                    stop_event.set()
+    return mismatched
+
+
+def _check_zip_local_headers(archive_path, infos):
+    bad_members = []
+    archive_size = os.path.getsize(archive_path)
+    with open(archive_path, 'rb') as f:
+        for info in infos:
+            f.seek(info.header_offset)
+            header = f.read(30)
+            if len(header) < 30 or header[:4] != b'PK\x03\x04':
+                bad_members.append((info.filename, "bad local header signature"))
+                continue
+            name_length, extra_length = struct.unpack('<HH', header[26:30])
+            encoding = 'utf-8' if info.flag_bits & 0x800 else 'cp437'
+            if name_length != len(info.orig_filename.encode(encoding, errors='replace')):
+                bad_members.append((info.filename, "local header does not match central directory"))
+            elif info.header_offset + 30 + name_length + extra_length + info.compress_size > archive_size:
+                bad_members.append((info.filename, "member data is truncated"))
+    return bad_members
+
+
+def _crc_check_zip_names(archive_path, names):
+    bad_members = []
+    with zipfile.ZipFile(archive_path, 'r') as zipf:
+        for name in names:
+            try:
+                with zipf.open(name) as src:
+                    for _ in iter_chunks(src):
+                        pass
+            except Exception as e:
+                bad_members.append((name, str(e)))
+    return bad_members
+
+
+def _balanced_chunks(infos, count):
+    chunks = [[] for _ in range(count)]
+    loads = [0] * count
+    for info in sorted(infos, key=lambda i: i.compress_size, reverse=True):
+        index = loads.index(min(loads))
+        chunks[index].append(info.filename)
+        loads[index] += info.compress_size
+    return [chunk for chunk in chunks if chunk]
+
+
+class ZipStrategy(ArchiveStrategy):
+    collector = FileCollector(parallel=True, order=FileCollector.ORDER_SIZE)
+    verify_workers = os.cpu_count() or 1
+    test_workers = os.cpu_count() or 1
+    # below this much compressed data, starting worker processes costs more than it saves
+    parallel_test_min_bytes = 64 * 1024 * 1024
+
+    def create(self, archive_manager, file_names_or_dir):
+        result_message = ""
+
+        if not archive_manager.archive_path.endswith(".zip"):
+            archive_manager.archive_path += ".zip"
+
+        try:
+            checksums = {}
+            collected_files = self.collector.collect(file_names_or_dir)
+            with zipfile.ZipFile(archive_manager.archive_path, 'w') as zipf:
+                _add_to_zip(zipf, collected_files, checksums)
+
+            checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+            ChecksumManager.save(checksums, checksum_file)
+
+            result_message += f"\033[32mChecksums saved to {checksum_file}.\n"
+            result_message += f"Archive {archive_manager.archive_path} created successfully.\033[0m\n"
+        except Exception as e:
+            result_message += f"\033[31mError creating ZIP archive: {e}\033[0m\n"
+
+        return result_message
+
+    def create_from_stream(self, archive_manager, members):
+        if not archive_manager.archive_path.endswith(".zip"):
+            archive_manager.archive_path += ".zip"
+
+        try:
+            checksums = {}
+            with zipfile.ZipFile(archive_manager.archive_path, 'w', compression=zipfile.ZIP_DEFLATED) as zipf:
+                _add_streams_to_zip(zipf, members, checksums)
+
+            checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+            ChecksumManager.save(checksums, checksum_file)
+
+            return f"\033[32mChecksums saved to {checksum_file}.\nArchive {archive_manager.archive_path} created successfully.\033[0m\n"
+        except Exception as e:
+            return f"\033[31mError creating ZIP archive: {e}\033[0m\n"
+
+    def add_from_stream(self, archive_manager, members):
+        try:
+            if not archive_manager.archive_path.endswith(".zip"):
+                return "\033[31mInvalid archive type. Expected ZIP archive.\033[0m\n"
+
+            added = {}
+            with zipfile.ZipFile(archive_manager.archive_path, 'a', compression=zipfile.ZIP_DEFLATED) as zipf:
+                _add_streams_to_zip(zipf, members, added)
+            ChecksumManager.update(f"{archive_manager.archive_path}.checksums.txt", added=added)
+
+            return f"\033[32mStreams added to {archive_manager.archive_path} successfully.\033[0m\n"
+        except Exception as e:
+            return f"\033[31mError adding streams to ZIP archive: {e}\033[0m\n"
+
+    def split(self, archive_manager, part_size):
+        if not archive_manager.archive_path.endswith(".zip"):
+            return "\033[31mInvalid archive type. Expected ZIP archive.\033[0m"
+
+        try:
+            num_parts = split_file(archive_manager.archive_path, part_size)
+
+            return f"\033[32mArchive split into {num_parts} parts successfully.\033[0m"
+        except Exception as e:
+            return f"\033[31mError splitting ZIP archive: {e}\033[0m"
+
+    def extract(self, archive_manager, extract_path):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".zip"):
+                result_message += "\033[31mInvalid archive type. Expected ZIP archive.\033[0m\n"
+                return result_message
+
+            st = os.stat(archive_manager.archive_path)
+            state = {'operation': OPERATION_EXTRACT, 'extract_path': os.path.abspath(extract_path),
+                     'archive_size': st.st_size, 'archive_mtime': st.st_mtime, 'next_index': 0}
+            result_message += self._extract_checkpointed(archive_manager, state)
+        except Exception as e:
+            result_message += f"\033[31mError extracting ZIP archive: {e}\033[0m\n"
+
+        return result_message
+
+    def resume(self, archive_manager):
+        try:
+            checkpoint = Checkpoint(archive_manager.archive_path)
+            if not checkpoint.exists():
+                return f"\033[33mNo checkpoint found for {archive_manager.archive_path}. Nothing to resume.\033[0m\n"
+            state = checkpoint.load()
+            if state['operation'] != OPERATION_EXTRACT:
+                return f"\033[31mCannot resume '{state['operation']}' for ZIP archives.\033[0m\n"
+            st = os.stat(archive_manager.archive_path)
+            if st.st_size != state['archive_size'] or st.st_mtime != state['archive_mtime']:
+                return f"\033[31m{archive_manager.archive_path} changed since the checkpoint. Extract it again.\033[0m\n"
+            return self._extract_checkpointed(archive_manager, state)
+        except Exception as e:
+            return f"\033[31mError resuming ZIP extraction: {e}\033[0m\n"
+
+    def _extract_checkpointed(self, archive_manager, state):
+        result_message = ""
+        checkpoint = Checkpoint(archive_manager.archive_path)
+        digests = checkpoint.load_digests(state)
+        with zipfile.ZipFile(archive_manager.archive_path, 'r') as zipf:
+            for index, info in _extract_zip_members(zipf, state['extract_path'], digests, state['next_index']):
+                if not info.is_dir():
+                    checkpoint.record(info.filename, digests[info.filename])
+                state['next_index'] = index + 1
+                if checkpoint.due(info.file_size):
+                    checkpoint.save(state)
+        checkpoint.clear()
+
+        checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+        if os.path.exists(checksum_file):
+            if ChecksumManager.compare(digests, checksum_file):
+                result_message += "\033[32mChecksum verification successful.\033[0m\n"
+            else:
+                result_message += "\033[31mChecksum verification failed. The extracted files may be corrupted.\033[0m\n"
+        else:
+            result_message += "\033[33mNo checksum file found. Skipping verification.\033[0m\n"
+
+        result_message += f"Archive extracted to {state['extract_path']}.\n"
+        return result_message
+
+    def iter_extract(self, archive_manager, extract_path):
+        if not archive_manager.archive_path.endswith(".zip"):
+            raise ValueError("Invalid archive type. Expected ZIP archive.")
+
+        digests = {}
+        with zipfile.ZipFile(archive_manager.archive_path, 'r') as zipf:
+            for index, info in _extract_zip_members(zipf, extract_path, digests):
+                yield info.filename
+
+        checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+        if os.path.exists(checksum_file) and not ChecksumManager.compare(digests, checksum_file):
+            raise ChecksumMismatch("Checksum verification failed. The extracted files may be corrupted.")
+
+    def add(self, archive_manager, file_names_or_dir):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".zip"):
+                result_message += "\033[31mInvalid archive type. Expected ZIP archive.\033[0m\n"
+                return result_message
+
+            added = {}
+            collected_files = self.collector.collect(file_names_or_dir)
+            with zipfile.ZipFile(archive_manager.archive_path, 'a') as zipf:
+                _add_to_zip(zipf, collected_files, added)
+            ChecksumManager.update(f"{archive_manager.archive_path}.checksums.txt", added=added)
+
+            result_message += "\033[32mFiles added to {archive_manager.archive_path} successfully.\033[0m\n"
+        except Exception as e:
+            result_message += f"\033[31mError adding files to ZIP archive: {e}\033[0m\n"
+
+        return result_message
+
+    def remove(self, archive_manager, items_to_remove):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".zip"):
+                result_message += "\033[31mInvalid archive type. Expected ZIP archive.\033[0m\n"
+                return result_message
+
+            items_to_remove = removal_items(items_to_remove)
+            keep = removal_filter(items_to_remove)
+            temp_archive = archive_manager.archive_path + '.temp'
+            # kept members are copied compressed, in bounded chunks, instead of being inflated into memory
+            with zipfile.ZipFile(archive_manager.archive_path, 'r') as existing_zip, \
+                    open(archive_manager.archive_path, 'rb') as source, \
+                    zipfile.ZipFile(temp_archive, 'w', compression=zipfile.ZIP_DEFLATED) as new_zip:
+                new_zip.comment = existing_zip.comment
+                for file_info in existing_zip.infolist():
+                    if keep(file_info.filename.rstrip('/')):
+                        copy_zip_entry_raw(source, file_info, new_zip)
+
+            os.remove(archive_manager.archive_path)
+            os.rename(temp_archive, archive_manager.archive_path)
+            ChecksumManager.update(f"{archive_manager.archive_path}.checksums.txt", removed=items_to_remove)
+
+            result_message += "\033[32mItems removed from {archive_manager.archive_path} successfully.\033[0m\n"
+        except Exception as e:
+            result_message += f"\033[31mError removing items from ZIP archive: {e}\033[0m\n"
+
+        return result_message
+
+    def edit_metadata(self, archive_manager, new_metadata):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".zip"):
+                result_message += "\033[31mInvalid archive type. Expected ZIP archive.\033[0m\n"
+                return result_message
+
+            with zipfile.ZipFile(archive_manager.archive_path, 'a') as zipf:
+                zipf.comment = new_metadata.encode('utf-8')
+
+            result_message += "\033[32mMetadata updated for {archive_manager.archive_path}.\033[0m\n"
+        except Exception as e:
+            result_message += f"\033[31mError editing metadata for ZIP archive: {e}\033[0m\n"
+
+        return result_message
+
+    def iter_members(self, archive_manager):
+        with zipfile.ZipFile(archive_manager.archive_path, 'r') as zipf:
+            for info in zipf.infolist():
+                if not info.is_dir():
+                    yield MemberInfo(info.filename, info.file_size, time.mktime(info.date_time + (0, 0, -1)))
+
+    def show_metadata(self, archive_manager):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".zip"):
+                result_message += "\033[31mInvalid archive type. Expected ZIP archive.\033[0m\n"
+                return result_message
+
+            with zipfile.ZipFile(archive_manager.archive_path, 'r') as zipf:
+                comment = zipf.comment.decode('utf-8')
+                result_message += f"\033[32mZIP Archive Comment:\n{comment}\033[0m\n"
+        except Exception as e:
+            result_message += f"\033[31mError showing metadata for {archive_manager.archive_path}: {e}\033[0m\n"
+
+        return result_message
+
+    def test(self, archive_manager, mode=None):
+        result_message = ""
+
+        try:
+            if not archive_manager.archive_path.endswith(".zip"):
+                result_message += "\033[31mInvalid archive type. Expected ZIP archive.\033[0m\n"
+                return result_message
+
+            with zipfile.ZipFile(archive_manager.archive_path, 'r') as zipf:
+                infos = [info for info in zipf.infolist() if not info.is_dir()]
+
+            bad_members = _check_zip_local_headers(archive_manager.archive_path, infos)
+            if mode != TEST_QUICK:
+                bad_names = {name for name, _ in bad_members}
+                infos = [info for info in infos if info.filename not in bad_names]
+                total_size = sum(info.compress_size for info in infos)
+                workers = min(self.test_workers, len(infos))
+                if workers > 1 and total_size >= self.parallel_test_min_bytes:
+                    # spawned rather than forked: a fork from the threaded peer server could copy a governor lock
+                    # that another session holds, and the worker would block on it forever
+                    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) \
+                            as executor:
+                        for result in executor.map(_crc_check_zip_names, repeat(archive_manager.archive_path),
+                                                   _balanced_chunks(infos, workers)):
+                            bad_members.extend(result)
+                else:
+                    bad_members.extend(_crc_check_zip_names(archive_manager.archive_path,
+                                                            [info.filename for info in infos]))
+
+            result_message += test_report("ZIP", archive_manager.archive_path, bad_members)
+        except Exception as e:
+            result_message += f"\033[31mError testing {archive_manager.archive_path}: {e}\033[0m\n"
+
+        return result_message
+
+    def verify(self, archive_manager, fail_fast=False):
+        try:
+            if not archive_manager.archive_path.endswith(".zip"):
+                return "\033[31mInvalid archive type. Expected ZIP archive.\033[0m\n"
+
+            checksum_file = f"{archive_manager.archive_path}.checksums.txt"
+            if not os.path.exists(checksum_file):
+                return "\033[33mNo checksum file found. Nothing to verify against.\033[0m\n"
+            expected = ChecksumManager.load(checksum_file)
+
+            with zipfile.ZipFile(archive_manager.archive_path, 'r') as zipf:
+                present = set(zipf.namelist())
+            names = [name for name in expected if name in present]
+            missing = [name for name in expected if name not in present]
+            if missing and fail_fast:
+                return verification_report(archive_manager.archive_path, 0, [], missing[:1])
+
+            workers = max(1, min(self.verify_workers, len(names)))
+            chunks = [names[i::workers] for i in range(workers)]
+            stop_event = threading.Event()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(
+                    lambda chunk: _verify_zip_names(archive_manager.archive_path, chunk, expected, stop_event, fail_fast),
+                    chunks)
+                mismatched = sorted(name for result in results for name in result)
+
+            return verification_report(archive_manager.archive_path, len(names), mismatched, missing)
+        except Exception as e:
+            return f"\033[31mError verifying {archive_manager.archive_path}: {e}\033[0m\n"
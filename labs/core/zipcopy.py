@@ -0,0 +1,42 @@
+import copy
+import struct
+import zipfile
+
+from cur.core.streams import COPY_BUFSIZE, copy_file_region
+
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+_DATA_DESCRIPTOR_FLAG = 0x08
+_ZIP64_EXTRA = 0x0001
+
+
+def member_data_offset(src_file, info):
+    src_file.seek(info.header_offset)
+    header = src_file.read(_LOCAL_HEADER_SIZE)
+    if len(header) < _LOCAL_HEADER_SIZE or header[:4] != _LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    return info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length
+
+
+def copy_zip_entry_raw(src_file, info, dst_zip, bufsize=COPY_BUFSIZE):
+    # copies the compressed payload as is; the sizes and CRC go into the local header,
+    # so the data descriptor of the source entry is not needed
+    data_offset = member_data_offset(src_file, info)
+
+    zinfo = copy.copy(info)
+    zinfo.flag_bits &= ~_DATA_DESCRIPTOR_FLAG
+    zinfo.extra = zipfile._strip_extra(info.extra, (_ZIP64_EXTRA,))
+
+    dst_zip.fp.seek(dst_zip.start_dir)
+    zinfo.header_offset = dst_zip.fp.tell()
+    dst_zip.fp.write(zinfo.FileHeader())
+
+    if copy_file_region(src_file, dst_zip.fp, data_offset, info.compress_size, bufsize) != info.compress_size:
+        raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+
+    dst_zip.filelist.append(zinfo)
+    dst_zip.NameToInfo[zinfo.filename] = zinfo
+    dst_zip.start_dir = dst_zip.fp.tell()
+    dst_zip._didModify = True
+    return zinfo
@@ -0,0 +1,269 @@
+import hashlib
+import hmac
+import ipaddress
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from cur import config
+from cur.core.facade import ArchiveFacade
+from cur.core.governor import PRIORITY_BACKGROUND, ThrottledSocket, priority
+
+CONNECT_TIMEOUT = 2
+PING_TIMEOUT = 0.5
+DISCOVERY_INTERVAL = 10
+# signed requests older or newer than this many seconds are rejected, so a captured one cannot be replayed later
+MAX_CLOCK_SKEW = 60
+
+PeerInfo = namedtuple('PeerInfo', ['host', 'port', 'load', 'cores'])
+
+# cluster jobs are batch work and yield to interactive peer sessions unless told otherwise
+ClusterJob = namedtuple('ClusterJob', ['command', 'archive_type', 'archive_path', 'args', 'priority'])
+ClusterJob.__new__.__defaults__ = ((), PRIORITY_BACKGROUND)
+
+JOB_COMMANDS = {
+    'create': lambda facade, args: facade.create_archive(*args),
+    'extract': lambda facade, args: facade.extract_archive(*args),
+    'test': lambda facade, args: facade.test_archive(*args),
+    'verify': lambda facade, args: facade.verify_archive(*args),
+    'resume': lambda facade, args: facade.resume_archive(),
+}
+
+
+class PeerUnavailable(Exception):
+    pass
+
+
+def _signature(message, secret):
+    payload = json.dumps(message, sort_keys=True).encode('utf-8')
+    return hmac.new(secret.encode('utf-8'), payload, hashlib.sha256).hexdigest()
+
+
+def _sign(message, secret):
+    # the secret itself never goes over the wire, since discovery also talks to whatever listens on a port
+    message = dict(message, sent=time.time())
+    message['auth'] = _signature(message, secret)
+    return message
+
+
+def _authentic(message, secret):
+    auth = message.pop('auth', None)
+    sent = message.get('sent')
+    if not isinstance(auth, str) or not isinstance(sent, (int, float)) or abs(time.time() - sent) > MAX_CLOCK_SKEW:
+        return False
+    return hmac.compare_digest(auth, _signature(message, secret))
+
+
+def _is_loopback(host):
+    if not host:
+        # an empty host binds to every interface
+        return False
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)}
+    except socket.gaierror:
+        return False
+    return all(ipaddress.ip_address(address.split('%')[0]).is_loopback for address in addresses)
+
+
+def _request(host, port, message, timeout=None):
+    if config.cluster_secret:
+        message = _sign(message, config.cluster_secret)
+    try:
+        with socket.create_connection((host, port), timeout=CONNECT_TIMEOUT) as sock:
+            sock.settimeout(timeout)
+            ThrottledSocket(sock).sendall(json.dumps(message).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+    except OSError as e:
+        raise PeerUnavailable(f"{host}:{port}: {e}")
+    if not line:
+        raise PeerUnavailable(f"{host}:{port}: connection closed")
+    try:
+        return json.loads(line)
+    except ValueError:
+        # something else is listening on this port, e.g. an interactive peer
+        raise PeerUnavailable(f"{host}:{port}: not a cluster peer")
+
+
+def ping(host, port):
+    reply = _request(host, port, {'op': 'ping'}, timeout=PING_TIMEOUT)
+    if not reply.get('ok'):
+        # e.g. a peer of another cluster that does not accept our secret
+        raise PeerUnavailable(f"{host}:{port}: {reply.get('error')}")
+    return PeerInfo(host, port, reply['load'], reply['cores'])
+
+
+def discover(hosts=None, ports=None):
+    addresses = [(host, port) for host in hosts or config.cluster_hosts for port in ports or config.server_ports]
+    with ThreadPoolExecutor(max_workers=len(addresses)) as executor:
+        results = executor.map(lambda address: _try_ping(*address), addresses)
+        return [peer for peer in results if peer is not None]
+
+
+def _try_ping(host, port):
+    try:
+        return ping(host, port)
+    except PeerUnavailable:
+        return None
+
+
+class _PeerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                reply = self.server.peer.dispatch(json.loads(line))
+            except Exception as e:
+                reply = {'ok': False, 'error': str(e)}
+            self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+
+
+class _PeerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ClusterPeer:
+    def __init__(self, port, host=None, secret=None):
+        self.host = host or config.cluster_bind_host
+        self.port = port
+        self.secret = config.cluster_secret if secret is None else secret
+        self.load = 0
+        self.known_peers = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    def dispatch(self, message):
+        if self.secret and not _authentic(message, self.secret):
+            return {'ok': False, 'error': "Authentication failed."}
+        op = message.get('op')
+        if op == 'ping':
+            with self._lock:
+                load = self.load
+            return {'ok': True, 'load': load, 'cores': os.cpu_count() or 1}
+        if op == 'peers':
+            return {'ok': True, 'peers': [list(peer[:2]) for peer in self.known_peers]}
+        if op == 'job':
+            return self._run_job(ClusterJob(message['command'], message['archive_type'], message['archive_path'],
+                                            message.get('args', []), message.get('priority', PRIORITY_BACKGROUND)))
+        return {'ok': False, 'error': f"Unknown operation: {op}"}
+
+    def _run_job(self, job):
+        if job.command not in JOB_COMMANDS:
+            return {'ok': False, 'error': f"Unsupported cluster command: {job.command}"}
+        with self._lock:
+            self.load += 1
+        try:
+            facade = ArchiveFacade(job.archive_type, job.archive_path)
+            if facade.archive_manager.strategy is None:
+                return {'ok': False, 'error': "Unknown archive type."}
+            with priority(job.priority):
+                return {'ok': True, 'result': JOB_COMMANDS[job.command](facade, job.args)}
+        finally:
+            with self._lock:
+                self.load -= 1
+
+    def _discovery_loop(self):
+        while True:
+            self.known_peers = [peer for peer in discover()
+                                if (peer.host, peer.port) != (self.host, self.port)]
+            time.sleep(DISCOVERY_INTERVAL)
+
+    def serve_forever(self):
+        if not self.secret and not _is_loopback(self.host):
+            raise ValueError(f"Refusing to serve cluster jobs on {self.host} without TRPZ_CLUSTER_SECRET.")
+        self._server = _PeerServer((self.host, self.port), _PeerHandler)
+        self._server.peer = self
+        threading.Thread(target=self._discovery_loop, daemon=True).start()
+        self._server.serve_forever()
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class ClusterCoordinator:
+    def __init__(self, peers=None, max_retries=3, jobs_per_core=1):
+        self.peers = list(peers) if peers is not None else discover()
+        self.max_retries = max_retries
+        self.jobs_per_core = jobs_per_core
+        self._in_flight = {}
+        self._dead = set()
+        self._lock = threading.Condition()
+
+    def run(self, jobs):
+        if not self.peers:
+            raise PeerUnavailable("No cluster peers found.")
+        self._in_flight = {(peer.host, peer.port): 0 for peer in self.peers}
+        capacity = sum(max(1, peer.cores * self.jobs_per_core) for peer in self.peers)
+        with ThreadPoolExecutor(max_workers=max(1, min(capacity, len(jobs)))) as executor:
+            return list(executor.map(self._run_with_retry, jobs))
+
+    def _pick_peer(self):
+        with self._lock:
+            alive = [peer for peer in self.peers if (peer.host, peer.port) not in self._dead]
+            if not alive:
+                raise PeerUnavailable("All cluster peers are unavailable.")
+            # advertised load at discovery time plus what this coordinator has sent since, per core
+            peer = min(alive, key=lambda p: (p.load + self._in_flight[(p.host, p.port)]) / max(1, p.cores))
+            self._in_flight[(peer.host, peer.port)] += 1
+            return peer
+
+    def _release(self, peer, dead=False):
+        with self._lock:
+            self._in_flight[(peer.host, peer.port)] -= 1
+            if dead:
+                self._dead.add((peer.host, peer.port))
+
+    def _run_with_retry(self, job):
+        last_error = None
+        for _ in range(self.max_retries + 1):
+            try:
+                peer = self._pick_peer()
+            except PeerUnavailable as e:
+                return {'ok': False, 'error': str(e), 'job': job._asdict()}
+            try:
+                reply = _request(peer.host, peer.port, {'op': 'job', **job._asdict(), 'args': list(job.args)})
+            except PeerUnavailable as e:
+                self._release(peer, dead=True)
+                last_error = str(e)
+                continue
+            self._release(peer)
+            reply['peer'] = f"{peer.host}:{peer.port}"
+            return reply
+        return {'ok': False, 'error': f"Job failed after {self.max_retries + 1} attempts: {last_error}",
+                'job': job._asdict()}
+
+
+def _serve_peer(port):
+    try:
+        ClusterPeer(port).serve_forever()
+    except OSError:
+        # port taken by another process; the cluster simply has one peer fewer
+        pass
+
+
+def start_cluster(count=None, ports=None):
+    ports = list(ports or config.server_ports)[:count or os.cpu_count() or 1]
+    processes = []
+    for port in ports:
+        process = multiprocessing.Process(target=_serve_peer, args=(port,))
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def main():
+    processes = start_cluster()
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,41 +1,59 @@
 import socket
 import threading
 from cur.config import server_ports
-from cur.core.adapters import TarGzAdapter, ZipAdapter, RarAdapter, AceAdapter
+from cur.core import registry
 from cur.core.facade import ArchiveFacade
-from cur.core.strategy import TarGzStrategy, ZipStrategy, RarStrategy, AceStrategy
+from cur.core.governor import PRIORITY_INTERACTIVE, ThrottledSocket, priority
 
 
 def handle_peer(client_socket):
-    client_socket.sendall(b'\033[33mWelcome!\nEnter command (help, create, extract, add, remove, edit_metadata, show_metadata, test, split exit) \033[0m')
-
-    adapters = {
-        'tar.gz': TarGzAdapter(TarGzStrategy()),
-        'zip': ZipAdapter(ZipStrategy()),
-        'rar': RarAdapter(RarStrategy()),
-        'ace': AceAdapter(AceStrategy())
-    }
+    client_socket.sendall(b'\033[33mWelcome!\nEnter command (help, create, extract, add, remove, edit_metadata, show_metadata, test, verify, resume, split, convert, find, scan exit) \033[0m')
 
     while True:
         command = client_socket.recv(1024).decode('utf-8').strip()
-        if command not in ['create','extract','add','remove','edit_metadata','show_metadata','test','split','exit','help']:
+        if command not in ['create','extract','add','remove','edit_metadata','show_metadata','test','verify','resume','split','convert','find','scan','exit','help']:
             message = b"\033[31mUnknown command.\033[0m"
             client_socket.sendall(message)
         elif command == 'help':
             help_message = display_help()
             client_socket.sendall(help_message.encode('utf-8'))
             continue
+        elif command in ('find', 'scan'):
+            from cur.core.catalog import ArchiveCatalog, FIND_NAME
+            catalog = ArchiveCatalog.default()
+            if catalog is None:
+                client_socket.sendall(add_command_prompt("\033[31mThe archive catalog is disabled.\033[0m").encode('utf-8'))
+                continue
+            if command == 'find':
+                client_socket.sendall(b'\033[33mEnter query as name:<file name>, glob:<pattern> or digest:<md5>:\033[0m')
+                query = client_socket.recv(1024).decode('utf-8').strip()
+                kind, query = query.split(':', 1) if ':' in query else (FIND_NAME, query)
+                try:
+                    response = format_find_results(catalog.find(query, kind))
+                except ValueError as e:
+                    response = f"\033[31m{e}\033[0m"
+            else:
+                client_socket.sendall(b'\033[33mEnter directories or archives to index, separated by space:\033[0m')
+                paths = client_socket.recv(1024).decode('utf-8').strip().split()
+                indexed, failed = catalog.scan(paths)
+                response = f"\033[32mIndexed {indexed} archive(s).\033[0m\n"
+                for path, error in failed:
+                    response += f"\033[31mCould not index {path}: {error}\033[0m\n"
+            client_socket.sendall(add_command_prompt(response).encode('utf-8'))
         else:
 
-            client_socket.sendall(b'\033[33mEnter archive type (tar.gz, zip, rar, ace):\033[0m')
+            client_socket.sendall(b'\033[33mEnter archive type (tar.gz, zip, rar, ace) or leave empty to detect it:\033[0m')
             archive_type = client_socket.recv(1024).decode('utf-8').strip()
             client_socket.sendall(b'\033[33mEnter the full path to the archive: \033[0m')
             archive_path = client_socket.recv(1024).decode('utf-8').strip()
-            if archive_type not in adapters:
+            if archive_type and not registry.is_registered(archive_type):
                 client_socket.sendall(b"\033[31mUnknown archive type.\033[0m")
                 continue
 
             archive_facade = ArchiveFacade(archive_type, archive_path)
+            if archive_facade.archive_manager.strategy is None:
+                client_socket.sendall(b"\033[31mUnknown archive type.\033[0m")
+                continue
 
             if command == 'create':
                 client_socket.sendall(b'\033[33mEnter files or directory to archive, separated by space:\033[0m')
@@ -58,6 +76,15 @@ def handle_peer(client_socket):
                 response = add_command_prompt(response)
                 client_socket.sendall(response.encode('utf-8'))
 
+            elif command == 'convert':
+                client_socket.sendall(b'\033[33mEnter target archive type (tar.gz, zip):\033[0m')
+                target_type = client_socket.recv(1024).decode('utf-8').strip()
+                client_socket.sendall(b'\033[33mEnter the full path to the target archive:\033[0m')
+                target_path = client_socket.recv(1024).decode('utf-8').strip()
+                response = archive_facade.convert_archive(target_type, target_path)
+                response = add_command_prompt(response)
+                client_socket.sendall(response.encode('utf-8'))
+
             elif command == 'add':
                 client_socket.sendall(b'\033[33mEnter files or directory to add to the archive, separated by space:\033[0m')
                 file_names_or_dir = client_socket.recv(1024).decode('utf-8').strip().split()
@@ -81,7 +108,19 @@ def handle_peer(client_socket):
                 response = add_command_prompt(response)
                 client_socket.sendall(response.encode('utf-8'))
             elif command == 'test':
-                response = archive_facade.test_archive()
+                client_socket.sendall(b'\033[33mEnter test mode (quick, deep) or leave empty for the default:\033[0m')
+                mode = client_socket.recv(1024).decode('utf-8').strip() or None
+                response = archive_facade.test_archive(mode)
+                response = add_command_prompt(response)
+                client_socket.sendall(response.encode('utf-8'))
+            elif command == 'verify':
+                client_socket.sendall(b'\033[33mStop at the first mismatch? (y/n):\033[0m')
+                fail_fast = client_socket.recv(1024).decode('utf-8').strip().lower() == 'y'
+                response = archive_facade.verify_archive(fail_fast)
+                response = add_command_prompt(response)
+                client_socket.sendall(response.encode('utf-8'))
+            elif command == 'resume':
+                response = archive_facade.resume_archive()
                 response = add_command_prompt(response)
                 client_socket.sendall(response.encode('utf-8'))
 
@@ -89,7 +128,14 @@ def handle_peer(client_socket):
                 client_socket.sendall(b"\033[31mUnknown command.\033[0m")
 
 def add_command_prompt(response):
-    return response + '\033[33m\nEnter command (create, extract, add, remove, edit_metadata, show_metadata, test, split exit):\033[0m '
+    return response + '\033[33m\nEnter command (create, extract, add, remove, edit_metadata, show_metadata, test, verify, resume, split, convert, find, scan exit):\033[0m '
+
+def format_find_results(rows):
+    if not rows:
+        return "\033[33mNo matching files found in the catalog.\033[0m"
+    lines = [f"{archive_path}: {name}" + (f" ({size} bytes)" if size is not None else "")
+             for archive_path, name, size, mtime, digest in rows]
+    return "\033[32m" + "\n".join(lines) + "\033[0m"
 
 def find_free_port():
     for port in server_ports:
@@ -100,7 +146,9 @@ def find_free_port():
 
 def handle_client_peer_wrapper(client_socket):
     try:
-        handle_peer(client_socket)
+        # a person is waiting on the other end, so this session goes ahead of cluster jobs and catalog scans
+        with priority(PRIORITY_INTERACTIVE):
+            handle_peer(ThrottledSocket(client_socket))
     except (ConnectionAbortedError, ConnectionResetError) as exp:
         pass
     finally:
@@ -117,7 +165,12 @@ def display_help():
     edit_metadata - Edit archive metadata
     show_metadata - Display archive metadata
     test - Test archive integrity
+    verify - Check archive contents against the checksum file without extracting
+    resume - Continue an interrupted create or extract from its last checkpoint
     split - Split an archive into parts
+    convert - Convert an archive to another type without extracting it
+    find - Find which archives contain a file (by name, glob or digest)
+    scan - Index existing archives into the catalog
     exit - Exit the program
     help - Display this help message\033[0m
     """
@@ -0,0 +1,13 @@
+import importlib.util
+import os
+import sys
+
+LABS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'labs')
+
+# the sources import themselves as the `cur` package, the name the labs directory is deployed under
+if 'cur' not in sys.modules:
+    spec = importlib.util.spec_from_file_location('cur', os.path.join(LABS_DIR, '__init__.py'),
+                                                  submodule_search_locations=[LABS_DIR])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['cur'] = module
+    spec.loader.exec_module(module)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# Stand-in for the rar and unrar tools, so the RAR strategy can be exercised where WinRAR is not installed.
+# It understands the commands RarBackend sends (a, x, d, c, t) and answers with rar's exit codes, but keeps
+# the archive as a zip file. test_rar_strategy.py points the backend at it; to try a peer against it, use
+#     export TRPZ_RAR=$PWD/tests/stand_in_rar.py TRPZ_UNRAR=$PWD/tests/stand_in_rar.py
+import os
+import sys
+import zipfile
+
+SUCCESS = 0
+BAD_CHECKSUM = 3
+OPEN_ERROR = 6
+WRONG_OPTION = 7
+NO_FILES = 10
+
+
+def _parse(args):
+    command = args[0]
+    separator = args.index('--')
+    switches = args[1:separator]
+    archive_path = args[separator + 1]
+    items = []
+    for arg in args[separator + 2:]:
+        if arg.startswith('@'):
+            with open(arg[1:], 'r', encoding='utf-8') as f:
+                items.extend(line.rstrip('\n') for line in f if line.strip())
+        else:
+            items.append(arg)
+    return command, switches, archive_path, items
+
+
+def _switch(switches, prefix):
+    for switch in switches:
+        if switch.startswith(prefix):
+            return switch[len(prefix):]
+    return None
+
+
+def _stored(path):
+    # like rar: relative to the working directory, without a drive, root or '..' parts
+    path = os.path.splitdrive(os.path.normpath(path))[1].replace(os.sep, '/')
+    return '/'.join(part for part in path.split('/') if part not in ('', '.', '..'))
+
+
+def _add(archive_path, items):
+    added = 0
+    with zipfile.ZipFile(archive_path, 'a', compression=zipfile.ZIP_DEFLATED) as zipf:
+        for item in items:
+            if os.path.isdir(item):
+                for root, dirs, files in os.walk(item):
+                    for file in files:
+                        path = os.path.join(root, file)
+                        zipf.write(path, _stored(path))
+                        added += 1
+            elif os.path.isfile(item):
+                zipf.write(item, _stored(item))
+                added += 1
+            else:
+                print(f"Cannot open {item}", file=sys.stderr)
+    return SUCCESS if added else NO_FILES
+
+
+def _delete(archive_path, items):
+    items = [item.rstrip('/') for item in items]
+    temp_path = archive_path + '.stand-in'
+    deleted = 0
+    with zipfile.ZipFile(archive_path, 'r') as src, zipfile.ZipFile(temp_path, 'w') as dst:
+        dst.comment = src.comment
+        for info in src.infolist():
+            name = info.filename.rstrip('/')
+            if any(name == item or name.startswith(item + '/') for item in items):
+                deleted += 1
+            else:
+                dst.writestr(info, src.read(info))
+    os.replace(temp_path, archive_path)
+    return SUCCESS if deleted else NO_FILES
+
+
+def _test(archive_path):
+    with zipfile.ZipFile(archive_path, 'r') as zipf:
+        bad = zipf.testzip()
+    if bad is not None:
+        print(f"CRC failed in {bad}", file=sys.stderr)
+        return BAD_CHECKSUM
+    return SUCCESS
+
+
+def main(args):
+    try:
+        command, switches, archive_path, items = _parse(args)
+    except (IndexError, ValueError):
+        print("usage: stand_in_rar.py <command> [switches] -- <archive> [@listfile]", file=sys.stderr)
+        return WRONG_OPTION
+    if command == 'a':
+        return _add(archive_path, items)
+    if command not in ('x', 'd', 'c', 't'):
+        print(f"Unsupported command {command}", file=sys.stderr)
+        return WRONG_OPTION
+    if not os.path.exists(archive_path):
+        print(f"Cannot open {archive_path}", file=sys.stderr)
+        return OPEN_ERROR
+    if command == 'x':
+        with zipfile.ZipFile(archive_path, 'r') as zipf:
+            zipf.extractall(_switch(switches, '-op') or '.')
+        return SUCCESS
+    if command == 'd':
+        return _delete(archive_path, items)
+    if command == 'c':
+        with open(_switch(switches, '-z'), 'rb') as f:
+            comment = f.read()
+        with zipfile.ZipFile(archive_path, 'a') as zipf:
+            zipf.comment = comment
+        return SUCCESS
+    return _test(archive_path)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,93 @@
+import os
+import zipfile
+
+import pytest
+
+from cur import config
+from cur.core.checksum import ChecksumManager
+from cur.core.manager import ArchiveManager
+from cur.core.rarbackend import RarBackend, RarError, RarJob
+
+STAND_IN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stand_in_rar.py')
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'rar_executable', STAND_IN)
+    monkeypatch.setattr(config, 'unrar_executable', STAND_IN)
+    monkeypatch.setattr(config, 'catalog_path', '')
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'src' / 'd').mkdir(parents=True)
+    (tmp_path / 'src' / 'd' / 'a.txt').write_text('a')
+    (tmp_path / 'src' / 'b.txt').write_text('b')
+    (tmp_path / 'single.txt').write_text('single')
+    return tmp_path
+
+
+def _names(archive_path):
+    with zipfile.ZipFile(archive_path) as zipf:
+        return sorted(zipf.namelist())
+
+
+def test_create_add_remove_extract(workdir):
+    manager = ArchiveManager('rar', 'out.rar')
+
+    assert 'created successfully' in manager.create(['src'])
+    assert _names('out.rar') == ['src/b.txt', 'src/d/a.txt']
+
+    assert 'added to' in manager.add(['single.txt'])
+    assert 'removed from' in manager.remove(['src/d/'])
+    assert _names('out.rar') == ['single.txt', 'src/b.txt']
+    with open('out.rar.checksums.txt') as f:
+        assert sorted(line.split()[0] for line in f) == ['single.txt', 'src/b.txt']
+
+    assert 'is valid' in manager.test()
+    result = manager.extract('extracted')
+    assert 'Checksum verification successful' in result
+    assert (workdir / 'extracted' / 'src' / 'b.txt').read_text() == 'b'
+
+
+def test_inputs_outside_the_archive_directory(workdir):
+    (workdir / 'archives').mkdir()
+    manager = ArchiveManager('rar', os.path.join('archives', 'out.rar'))
+    manager.create(['src'])
+
+    assert 'Checksum verification successful' in manager.extract('extracted')
+    # the manifest must be checked against the extracted copy, never against the sources next to the archive
+    (workdir / 'extracted' / 'src' / 'b.txt').write_text('changed')
+    assert not ChecksumManager.verify('extracted', os.path.join('archives', 'out.rar.checksums.txt'))
+
+
+def test_exit_codes_are_reported(workdir):
+    manager = ArchiveManager('rar', 'out.rar')
+    manager.create(['src'])
+
+    result = manager.remove(['missing.txt'])
+    assert "exited with code 10" in result
+
+    with open('out.rar', 'r+b') as f:
+        f.seek(40)
+        f.write(b'\xff' * 8)
+    assert 'may be corrupt' in manager.test()
+
+
+def test_run_many_batches_jobs_per_archive(workdir):
+    backend = RarBackend(STAND_IN, STAND_IN, max_processes=2)
+    jobs = [RarJob('a', 'one.rar', ('single.txt',)), RarJob('a', 'one.rar', ('src',)),
+            RarJob('a', 'two.rar', ('src',)), RarJob('d', 'two.rar', ('nothing',))]
+
+    results = backend.run_many(jobs)
+
+    assert results[0] is results[1]
+    assert results[0].job.items == ('single.txt', 'src')
+    assert results[2].returncode == 0
+    assert isinstance(results[3], RarError)
+    assert _names('one.rar') == ['single.txt', 'src/b.txt', 'src/d/a.txt']
+
+
+def test_batch_keeps_different_jobs_apart():
+    jobs = [RarJob('d', 'x.rar', ('a',)), RarJob('d', 'x.rar', ('b',)), RarJob('t', 'x.rar'),
+            RarJob('d', 'x.rar', ('c',))]
+
+    assert RarBackend.batch(jobs) == [(RarJob('d', 'x.rar', ('a', 'b')), [0, 1]), (RarJob('t', 'x.rar'), [2]),
+                                      (RarJob('d', 'x.rar', ('c',)), [3])]